@@ -0,0 +1,70 @@
+"""add task_user primary key, missing indexes and cascade deletes
+
+Revision ID: 5c9a0d7e3b21
+Revises: 8e4d2a6c1f03
+Create Date: 2026-10-18 15:02:19.774310
+
+Indexes are built with CREATE INDEX CONCURRENTLY and the foreign keys are
+re-added as NOT VALID and validated separately, so the migration can run
+against live tables without long exclusive locks.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9a0d7e3b21'
+down_revision: Union[str, None] = '8e4d2a6c1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Рядки, які не можуть увійти в первинний ключ: NULL та дублікати
+    op.execute('DELETE FROM task_user WHERE task_id IS NULL OR user_id IS NULL')
+    op.execute(
+        'DELETE FROM task_user a USING task_user b '
+        'WHERE a.ctid < b.ctid AND a.task_id = b.task_id AND a.user_id = b.user_id'
+    )
+    op.alter_column('task_user', 'task_id', existing_type=sa.Integer(), nullable=False)
+    op.alter_column('task_user', 'user_id', existing_type=sa.Integer(), nullable=False)
+
+    # CONCURRENTLY не працює всередині транзакції
+    with op.get_context().autocommit_block():
+        op.create_index('task_user_pkey', 'task_user', ['task_id', 'user_id'], unique=True, postgresql_concurrently=True)
+        op.create_index('ix_task_user_user_id_task_id', 'task_user', ['user_id', 'task_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_tasks_creator_id'), 'tasks', ['creator_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_status_priority', 'tasks', ['status', 'priority'], unique=False, postgresql_concurrently=True)
+
+    op.execute('ALTER TABLE task_user ADD CONSTRAINT task_user_pkey PRIMARY KEY USING INDEX task_user_pkey')
+
+    op.drop_constraint('task_user_task_id_fkey', 'task_user', type_='foreignkey')
+    op.drop_constraint('task_user_user_id_fkey', 'task_user', type_='foreignkey')
+    op.execute(
+        'ALTER TABLE task_user ADD CONSTRAINT task_user_task_id_fkey '
+        'FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE NOT VALID'
+    )
+    op.execute(
+        'ALTER TABLE task_user ADD CONSTRAINT task_user_user_id_fkey '
+        'FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE NOT VALID'
+    )
+    op.execute('ALTER TABLE task_user VALIDATE CONSTRAINT task_user_task_id_fkey')
+    op.execute('ALTER TABLE task_user VALIDATE CONSTRAINT task_user_user_id_fkey')
+
+
+def downgrade() -> None:
+    op.drop_constraint('task_user_task_id_fkey', 'task_user', type_='foreignkey')
+    op.drop_constraint('task_user_user_id_fkey', 'task_user', type_='foreignkey')
+    op.create_foreign_key('task_user_task_id_fkey', 'task_user', 'tasks', ['task_id'], ['id'])
+    op.create_foreign_key('task_user_user_id_fkey', 'task_user', 'users', ['user_id'], ['id'])
+
+    op.drop_constraint('task_user_pkey', 'task_user', type_='primary')
+    op.alter_column('task_user', 'user_id', existing_type=sa.Integer(), nullable=True)
+    op.alter_column('task_user', 'task_id', existing_type=sa.Integer(), nullable=True)
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_status_priority', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_tasks_creator_id'), table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_task_user_user_id_task_id', table_name='task_user', postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""add task change sequence, updated_at and tombstones
+
+Revision ID: b83f5d21c9a4
+Revises: a47c2e9d1b60
+Create Date: 2026-10-18 19:26:11.540218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83f5d21c9a4'
+down_revision: Union[str, None] = 'a47c2e9d1b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('tasks', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    # Наявні задачі отримують різні номери змін, щоб повна синхронізація могла йти сторінками
+    op.execute('UPDATE tasks SET change_seq = id')
+    op.create_index(op.f('ix_tasks_change_seq'), 'tasks', ['change_seq'], unique=False)
+
+    op.create_table('task_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('creator_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_tombstones_change_seq'), 'task_tombstones', ['change_seq'], unique=False)
+
+    op.create_table('sync_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('purged_seq', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute('INSERT INTO sync_state (id, last_seq, purged_seq) SELECT 1, COALESCE(MAX(id), 0), 0 FROM tasks')
+
+
+def downgrade() -> None:
+    op.drop_table('sync_state')
+    op.drop_index(op.f('ix_task_tombstones_change_seq'), table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index(op.f('ix_tasks_change_seq'), table_name='tasks')
+    op.drop_column('tasks', 'updated_at')
+    op.drop_column('tasks', 'change_seq')
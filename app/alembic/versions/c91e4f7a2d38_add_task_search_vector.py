@@ -0,0 +1,68 @@
+"""add full-text search vector to tasks
+
+Revision ID: c91e4f7a2d38
+Revises: b83f5d21c9a4
+Create Date: 2026-10-18 20:41:37.092614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91e4f7a2d38'
+down_revision: Union[str, None] = 'b83f5d21c9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    # Звичайна nullable-колонка додається без переписування таблиці (на відміну від
+    # GENERATED ... STORED, що тримає ACCESS EXCLUSIVE на весь перерахунок)
+    op.add_column('tasks', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Нові й змінені рядки рахує тригер
+    op.execute(
+        "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ "
+        "BEGIN "
+        "NEW.search_vector := "
+        "setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B'); "
+        "RETURN NEW; "
+        "END $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_search_vector_update BEFORE INSERT OR UPDATE OF name, description "
+        "ON tasks FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()"
+    )
+
+    # Наявні рядки заповнюються пакетами, кожен у власній транзакції, щоб не
+    # блокувати записи надовго; CONCURRENTLY не працює всередині транзакції
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM tasks")).one()
+        if low is not None:
+            for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+                bind.execute(
+                    sa.text(
+                        "UPDATE tasks SET search_vector = "
+                        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                        "setweight(to_tsvector('simple', coalesce(description, '')), 'B') "
+                        "WHERE id >= :start AND id < :stop AND search_vector IS NULL"
+                    ),
+                    {"start": start, "stop": start + BACKFILL_BATCH_SIZE},
+                )
+        op.create_index('ix_tasks_search_vector', 'tasks', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', postgresql_concurrently=True)
+    op.execute("DROP TRIGGER tasks_search_vector_update ON tasks")
+    op.execute("DROP FUNCTION tasks_search_vector_update()")
+    op.drop_column('tasks', 'search_vector')
@@ -0,0 +1,44 @@
+"""add task_stats summary table
+
+Revision ID: d5a8b3c6e417
+Revises: c91e4f7a2d38
+Create Date: 2026-10-18 22:03:48.716530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8b3c6e417'
+down_revision: Union[str, None] = 'c91e4f7a2d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_stats',
+    sa.Column('dimension', sa.String(length=16), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('TODO', 'IN_PROGRESS', 'DONE', name='taskstatus', create_type=False), nullable=False),
+    sa.Column('priority', postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', name='taskpriority', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'subject_id', 'status', 'priority')
+    )
+    # Початкове заповнення тим самим GROUP BY, що й task_stats_cli.py rebuild
+    op.execute(
+        "INSERT INTO task_stats (dimension, subject_id, status, priority, count) "
+        "SELECT dimension, subject_id, status, priority, count(*) FROM ("
+        "SELECT 'creator' AS dimension, creator_id AS subject_id, status, priority FROM tasks "
+        "UNION ALL "
+        "SELECT 'assignee', task_user.user_id, tasks.status, tasks.priority "
+        "FROM task_user JOIN tasks ON tasks.id = task_user.task_id"
+        ") AS memberships GROUP BY dimension, subject_id, status, priority"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_stats')
@@ -0,0 +1,37 @@
+"""add notification outbox failed_at
+
+Revision ID: e7b2c4f19a05
+Revises: d5a8b3c6e417
+Create Date: 2026-10-18 23:12:40.381927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2c4f19a05'
+down_revision: Union[str, None] = 'd5a8b3c6e417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notification_outbox', sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Частковий індекс релею тепер пропускає і dead letter;
+    # CONCURRENTLY не працює всередині транзакції
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notification_outbox_pending', 'notification_outbox', ['id'], unique=False, postgresql_where=sa.text('sent_at IS NULL AND failed_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_notification_outbox_unsent', table_name='notification_outbox', postgresql_concurrently=True)
+    op.execute('ALTER INDEX ix_notification_outbox_pending RENAME TO ix_notification_outbox_unsent')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notification_outbox_all_unsent', 'notification_outbox', ['id'], unique=False, postgresql_where=sa.text('sent_at IS NULL'), postgresql_concurrently=True)
+        op.drop_index('ix_notification_outbox_unsent', table_name='notification_outbox', postgresql_concurrently=True)
+    op.execute('ALTER INDEX ix_notification_outbox_all_unsent RENAME TO ix_notification_outbox_unsent')
+    op.drop_column('notification_outbox', 'failed_at')
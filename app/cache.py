@@ -0,0 +1,335 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from config import (
+    CACHE_BACKEND,
+    CACHE_LOCAL_SIZE,
+    CACHE_LOCAL_TTL,
+    CACHE_REDIS_URL,
+    CACHE_TTL,
+)
+
+MISSING = object()
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Лічильник інвалідацій ключа: заповнення, що почалося до інвалідації, відкидається
+GENERATION_KEY = "cache:gen:{}"
+
+# Позначки в session.info: сесія репліки (ReplicaSet), читання у вікні read-your-writes
+# і чи відкриває транзакція get_db це вікно (вхід без перехешування пароля - ні)
+REPLICA_INFO_KEY = "replica"
+READ_YOUR_WRITES_INFO_KEY = "read_your_writes"
+DB_WRITE_INFO_KEY = "db_write"
+
+
+class TTLCache:
+    """
+    Простий in-process LRU-кеш з обмеженим розміром і часом життя записів.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            del self._data[key]
+        elif len(self._data) >= self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend:
+    """
+    Shared (second) cache tier. Values are bytes; invalidations are broadcast
+    to every process through publish/subscribe. Every key has a generation
+    that invalidation bumps: a value is stored only if the generation read
+    before loading it is still current, so a reader that loaded a row before
+    a write committed cannot put it back after the write's invalidation.
+    """
+
+    async def get(self, key: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """The cached value (None on a miss) and the key's current generation."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float, generation: Optional[bytes]) -> bool:
+        """Stores the value unless the key was invalidated since `generation` was read."""
+        raise NotImplementedError
+
+    async def invalidate(self, keys: List[str], ttl: float) -> None:
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process stand-in for Redis: one instance shared by several
+    TwoTierCache objects behaves like several workers sharing one Redis.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def _get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return item[1]
+
+    async def get(self, key: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        return self._get(key), self._get(GENERATION_KEY.format(key))
+
+    async def set(self, key: str, value: bytes, ttl: float, generation: Optional[bytes]) -> bool:
+        if self._get(GENERATION_KEY.format(key)) != generation:
+            return False
+        self._data[key] = (time.monotonic() + ttl, value)
+        return True
+
+    async def invalidate(self, keys: List[str], ttl: float) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+            generation_key = GENERATION_KEY.format(key)
+            generation = int(self._get(generation_key) or 0) + 1
+            self._data[generation_key] = (time.monotonic() + ttl, str(generation).encode())
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for queue in self._subscribers.get(channel, []):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, []).append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].remove(queue)
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            import redis.asyncio as aioredis
+
+            client = aioredis.Redis.from_url(url)
+        self.client = client
+
+    async def get(self, key: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        value, generation = await self.client.mget(key, GENERATION_KEY.format(key))
+        return value, generation
+
+    async def set(self, key: str, value: bytes, ttl: float, generation: Optional[bytes]) -> bool:
+        from redis.exceptions import WatchError
+
+        # Оптимістичне блокування: EXEC не виконається, якщо ключ інвалідували після WATCH
+        generation_key = GENERATION_KEY.format(key)
+        async with self.client.pipeline() as pipeline:
+            try:
+                await pipeline.watch(generation_key)
+                if await pipeline.get(generation_key) != generation:
+                    return False
+                pipeline.multi()
+                pipeline.set(key, value, px=int(ttl * 1000))
+                await pipeline.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def invalidate(self, keys: List[str], ttl: float) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            generation_key = GENERATION_KEY.format(key)
+            pipeline.incr(generation_key)
+            pipeline.pexpire(generation_key, int(ttl * 1000))
+        pipeline.delete(*keys)
+        await pipeline.execute()
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self.client.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+
+class TwoTierCache:
+    """
+    Read-through cache of serialized objects: a small per-process LRU with a
+    short TTL in front of a shared backend. Writers invalidate keys in both
+    tiers and publish them, so other processes drop their local copies too;
+    the local TTL bounds staleness if an invalidation message is lost.
+
+    Only primary sessions fill the cache: a replica may lag behind a write
+    whose invalidation has already run. Sessions in a client's
+    read-your-writes window bypass the cache altogether.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        ttl: float = 60.0,
+        local_size: int = 10000,
+        local_ttl: float = 5.0,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=local_size, ttl=local_ttl)
+        self.origin = uuid.uuid4().hex
+        self.hits = {"local": 0, "remote": 0}
+        self.misses = 0
+        # Зростає з кожною локальною інвалідацією: значення, прочитане до неї, не кладеться в LRU
+        self._local_generation = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @property
+    def evictions(self) -> int:
+        return self.local.evictions
+
+    def _ensure_listener(self) -> None:
+        # Слухач запускається ліниво в поточному event loop і перезапускається, якщо впав
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self.backend.subscribe(INVALIDATION_CHANNEL):
+                    data = json.loads(message)
+                    if data["origin"] != self.origin:
+                        self._local_generation += 1
+                        for key in data["keys"]:
+                            self.local.pop(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed: {e!r}")
+            # Повідомлення могли загубитися, поки підписки не було
+            self._local_generation += 1
+            self.local.clear()
+            await asyncio.sleep(1)
+
+    async def read_through(
+        self,
+        db_session,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+    ) -> Any:
+        if not self.enabled or db_session.info.get(READ_YOUR_WRITES_INFO_KEY):
+            return await load()
+        self._ensure_listener()
+        local_generation = self._local_generation
+        raw = self.local.get(key, None)
+        if raw is not None:
+            self.hits["local"] += 1
+            return decode(raw)
+
+        raw, generation = await self.backend.get(key)
+        if raw is not None:
+            self.hits["remote"] += 1
+            if self._local_generation == local_generation:
+                self.local.set(key, raw)
+            return decode(raw)
+
+        self.misses += 1
+        value = await load()
+        if value is not None and REPLICA_INFO_KEY not in db_session.info:
+            raw = encode(value)
+            stored = await self.backend.set(key, raw, self.ttl, generation)
+            if stored and self._local_generation == local_generation:
+                self.local.set(key, raw)
+        return value
+
+    async def invalidate(self, keys: Iterable[str]) -> None:
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return
+        self._local_generation += 1
+        for key in keys:
+            self.local.pop(key)
+        await self.backend.invalidate(keys, self.ttl)
+        await self.backend.publish(
+            INVALIDATION_CHANNEL, json.dumps({"origin": self.origin, "keys": keys}).encode()
+        )
+
+    def invalidate_after_commit(self, db_session, keys: Iterable[str]) -> None:
+        # Ключі скидаються після коміту (get_db): інакше паралельне читання
+        # встигло б покласти в кеш ще незакомічені старі дані
+        if self.enabled:
+            db_session.info.setdefault("cache_invalidations", set()).update(keys)
+
+    async def flush_invalidations(self, db_session) -> None:
+        keys = db_session.info.pop("cache_invalidations", None)
+        if keys:
+            try:
+                await self.invalidate(keys)
+            except Exception as e:
+                # Запис уже закомічено; застарілі дані проживуть не довше за TTL
+                logger.error(f"Cache invalidation failed: {e!r}")
+
+
+def create_backend(name: str) -> Optional[CacheBackend]:
+    if name == "redis":
+        return RedisBackend(CACHE_REDIS_URL)
+    if name == "memory":
+        return MemoryBackend()
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+# Кеш задач і користувачів (серіалізовані TaskResponse/UserResponse)
+entity_cache = TwoTierCache(
+    create_backend(CACHE_BACKEND),
+    ttl=CACHE_TTL,
+    local_size=CACHE_LOCAL_SIZE,
+    local_ttl=CACHE_LOCAL_TTL,
+)
@@ -1,6 +1,14 @@
 # app/celery_app.py
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 import os
+from .config import (
+    TRACE_EXPORTER,
+    TRACE_FILE,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_SAMPLE_RATIO,
+    TRACING_ENABLED,
+)
 
 BROKER_URL = os.getenv("BROKER_URL", "redis://redis:6379/0")
 RESULT_BACKEND = os.getenv("RESULT_BACKEND", "redis://redis:6379/0")
@@ -17,4 +25,25 @@ celery_app.config_from_object(default_config)
 
 celery_app.conf.update(task_track_started=True, task_serializer="json")
 
-# celery_app.autodiscover_tasks(['app.email_utils'])
\ No newline at end of file
+# celery_app.autodiscover_tasks(['app.email_utils'])
+
+
+# Трасування налаштовується в кожному дочірньому процесі: фоновий потік
+# експортера не переживає fork
+@worker_process_init.connect
+def init_tracing(**kwargs):
+    if TRACING_ENABLED:
+        from .tracing import configure_tracing, instrument_worker
+
+        configure_tracing(
+            "pyjira-worker", TRACE_SAMPLE_RATIO, TRACE_EXPORTER, TRACE_FILE, TRACE_OTLP_ENDPOINT
+        )
+        instrument_worker()
+
+
+@worker_process_shutdown.connect
+def flush_traces(**kwargs):
+    if TRACING_ENABLED:
+        from .tracing import shutdown_tracing
+
+        shutdown_tracing()
@@ -1 +1,14 @@
-imports = {"app.email_utils"}
\ No newline at end of file
+from app.config import OUTBOX_RELAY_INTERVAL, SYNC_PURGE_INTERVAL
+
+imports = {"app.email_utils", "app.notifications", "app.outbox", "app.sync_cleanup"}
+
+beat_schedule = {
+    "relay-notification-outbox": {
+        "task": "relay_outbox_task",
+        "schedule": OUTBOX_RELAY_INTERVAL,
+    },
+    "purge-task-tombstones": {
+        "task": "purge_tombstones_task",
+        "schedule": SYNC_PURGE_INTERVAL,
+    },
+}
@@ -0,0 +1,207 @@
+import asyncio
+import json
+from typing import AsyncIterator, Iterable, List, Optional, Set
+
+from loguru import logger
+
+from config import FEED_BROKER, FEED_HEARTBEAT, FEED_QUEUE_SIZE, FEED_REDIS_URL
+from enums import UserRole
+
+CHANGES_CHANNEL = "tasks:changes"
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# Маркер у черзі підписки: клієнт не встигав читати, події втрачено
+OVERFLOW = object()
+
+
+def task_event(kind: str, task_id: int, creator_id: int, version: Optional[int] = None) -> dict:
+    # Події легкі: клієнт сам дочитує задачу (GET /tasks/{task_id} з ETag)
+    return {"type": kind, "task_id": task_id, "creator_id": creator_id, "version": version}
+
+
+def publish_after_commit(db_session, events: Iterable[dict]) -> None:
+    # Події відправляє get_db після успішного коміту, тож відкочені зміни не видно
+    db_session.info.setdefault("task_events", []).extend(events)
+
+
+def pending_events(db_session) -> List[dict]:
+    return db_session.info.get("task_events", [])
+
+
+class Subscription:
+    """
+    One connected client. The queue is bounded: a consumer that falls more
+    than `maxsize` events behind is cut off with OVERFLOW and has to resync
+    with GET /tasks, so a slow client never holds memory or slows others.
+    """
+
+    def __init__(self, user, maxsize: int):
+        self.user = user
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def accepts(self, event: dict) -> bool:
+        # Ті самі правила, що й у GET /tasks: USER бачить лише власні задачі
+        if self.user.role == UserRole.USER:
+            return event["creator_id"] == self.user.id
+        return True
+
+    def offer(self, event: dict) -> None:
+        if self.closed or not self.accepts(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflow()
+
+    def overflow(self) -> None:
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(OVERFLOW)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """Delivers events to subscribers of this process only (tests, single worker)."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.subscriptions: Set[Subscription] = set()
+
+    def subscribe(self, user) -> Subscription:
+        subscription = Subscription(user, self.queue_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def dispatch(self, events: Iterable[dict]) -> None:
+        for event in events:
+            for subscription in list(self.subscriptions):
+                subscription.offer(event)
+                if subscription.closed:
+                    self.subscriptions.discard(subscription)
+
+    async def publish(self, events: List[dict]) -> None:
+        self.dispatch(events)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Publishes events to a Redis channel; one listener per process receives
+    every worker's events and dispatches them to local subscribers.
+    """
+
+    def __init__(self, url: Optional[str] = None, queue_size: int = 100, client=None):
+        super().__init__(queue_size)
+        if client is None:
+            import redis.asyncio as aioredis
+
+            client = aioredis.Redis.from_url(url)
+        self.client = client
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, user) -> Subscription:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return super().subscribe(user)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.client.pubsub()
+                await pubsub.subscribe(CHANGES_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.dispatch(json.loads(message["data"]))
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task change feed listener failed: {e!r}")
+            # Поки підписки не було, події могли загубитися: клієнти мають пересинхронізуватися
+            for subscription in list(self.subscriptions):
+                subscription.overflow()
+            self.subscriptions.clear()
+            await asyncio.sleep(1)
+
+    async def publish(self, events: List[dict]) -> None:
+        try:
+            await self.client.publish(CHANGES_CHANNEL, json.dumps(events))
+        except Exception as e:
+            # Зміни вже закомічено; підписники пропустять подію, але запит не падає
+            logger.error(f"Failed to publish task changes: {e!r}")
+
+
+def create_broker(name: str) -> InProcessBroker:
+    if name == "redis":
+        return RedisBroker(FEED_REDIS_URL, FEED_QUEUE_SIZE)
+    if name == "memory":
+        return InProcessBroker(FEED_QUEUE_SIZE)
+    raise ValueError(f"Unknown change feed broker: {name}")
+
+
+broker = create_broker(FEED_BROKER)
+
+
+async def flush_events(db_session) -> None:
+    events = db_session.info.pop("task_events", None)
+    if events:
+        await broker.publish(events)
+
+
+async def sse_stream(subscription: Subscription) -> AsyncIterator[str]:
+    """Server-sent events for one subscription; ends with a `resync` event on overflow."""
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), FEED_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Коментар SSE: тримає з'єднання живим через проксі
+                yield ": keepalive\n\n"
+                continue
+            if event is OVERFLOW:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def websocket_stream(websocket, subscription: Subscription) -> None:
+    """
+    Sends events as JSON messages until the client disconnects. On overflow a
+    {"type": "resync"} message is sent and the socket is closed.
+    """
+    # Повідомлення від клієнта не очікуються, але читати їх треба, щоб помітити відключення
+    receiver = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    getter.cancel()
+                    return
+                receiver = asyncio.create_task(websocket.receive())
+            if getter not in done:
+                getter.cancel()
+                continue
+            event = getter.result()
+            if event is OVERFLOW:
+                await websocket.send_json({"type": "resync"})
+                await websocket.close(code=1013)
+                return
+            await websocket.send_json(event)
+    finally:
+        receiver.cancel()
+        broker.unsubscribe(subscription)
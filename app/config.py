@@ -3,19 +3,98 @@ import os
 
 load_dotenv()
 
-DATABASE_URL = f"postgresql+asyncpg://{os.getenv('DEFAULT_USER')}:" \
+DATABASE_URL = os.getenv('DATABASE_URL') or \
+    f"postgresql+asyncpg://{os.getenv('DEFAULT_USER')}:" \
     f"{os.getenv('DEFAULT_PASSWORD')}@" \
     f"{os.getenv('DEFAULT_HOST')}:{os.getenv('DEFAULT_PORT')}/" \
     f"{os.getenv('DEFAULT_DB')}"
 
+# Один запит - одна транзакція (моделі роблять flush, get_db комітить один раз)
+UNIT_OF_WORK = os.getenv('UNIT_OF_WORK', 'True') == 'True'
+
+# Репліки для читання (через кому); недоступна репліка пропускається
+# REPLICA_FAILURE_COOLDOWN секунд. Після запису клієнт READ_YOUR_WRITES_WINDOW
+# секунд читає з primary, щоб бачити власні зміни попри затримку реплікації
+REPLICA_URLS = [url.strip() for url in os.getenv('REPLICA_URLS', '').split(',') if url.strip()]
+REPLICA_FAILURE_COOLDOWN = float(os.getenv('REPLICA_FAILURE_COOLDOWN', '30'))
+# Зависла репліка не повинна тримати запит: ліміти на з'єднання і на запит (секунди)
+REPLICA_CONNECT_TIMEOUT = float(os.getenv('REPLICA_CONNECT_TIMEOUT', '2'))
+REPLICA_STATEMENT_TIMEOUT = float(os.getenv('REPLICA_STATEMENT_TIMEOUT', '5'))
+READ_YOUR_WRITES_WINDOW = float(os.getenv('READ_YOUR_WRITES_WINDOW', '5'))
+
 USE_MAILING = os.getenv('USE_MAILING', 'False') == 'True'
 MAIL_USERNAME = os.getenv('MAIL_USERNAME')
 MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
 MAIL_FROM = os.getenv('MAIL_FROM')
 MAIL_PORT = os.getenv('MAIL_PORT')
 MAIL_SERVER = os.getenv('MAIL_SERVER')
-MAIL_TLS = os.getenv('MAIL_TLS')
+MAIL_TLS = os.getenv('MAIL_TLS', 'True') == 'True'
+MAIL_MAX_RETRIES = int(os.getenv('MAIL_MAX_RETRIES', '5'))
+
+# Пул SMTP-з'єднань у кожному процесі Celery-воркера
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '2'))
+SMTP_KEEPALIVE = float(os.getenv('SMTP_KEEPALIVE', '30'))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
 
 SECRET_KEY = os.getenv('SECRET_KEY')
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Скільки секунд воркер довіряє закешованій версії токенів користувача
+TOKEN_VERSION_CACHE_TTL = float(os.getenv('TOKEN_VERSION_CACHE_TTL', '5'))
+TOKEN_VERSION_CACHE_SIZE = int(os.getenv('TOKEN_VERSION_CACHE_SIZE', '10000'))
+
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# Пул потоків для bcrypt: кількість потоків і скільки запитів може чекати в черзі
+HASHING_MAX_WORKERS = int(os.getenv('HASHING_MAX_WORKERS', '4'))
+HASHING_MAX_QUEUE = int(os.getenv('HASHING_MAX_QUEUE', '32'))
+
+# Максимальна кількість елементів у POST/PATCH /tasks/bulk
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '5000'))
+
+# Релей outbox: як часто Celery beat запускає розсилку і скільки листів за раз
+OUTBOX_RELAY_INTERVAL = float(os.getenv('OUTBOX_RELAY_INTERVAL', '5'))
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '100'))
+# Після стількох невдалих спроб подія отримує failed_at і більше не пересилається
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+
+# Дайджести сповіщень: зміни за вікно NOTIFY_DIGEST_WINDOW секунд об'єднуються
+# в один лист на користувача, розсилка ділиться на групи по NOTIFY_FANOUT_CHUNK адрес
+NOTIFY_REDIS_URL = os.getenv('NOTIFY_REDIS_URL', os.getenv('BROKER_URL', 'redis://redis:6379/0'))
+NOTIFY_DIGEST_WINDOW = int(os.getenv('NOTIFY_DIGEST_WINDOW', '60'))
+NOTIFY_FANOUT_CHUNK = int(os.getenv('NOTIFY_FANOUT_CHUNK', '100'))
+
+# Метрики Prometheus на /metrics; запити, довші за SLOW_REQUEST_MS, логуються
+# разом з їхніми SQL-запитами (0 вимикає лог)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '0'))
+
+# Трасування (OpenTelemetry): частка запитів, що трасуються, і куди експортуються
+# спани: "file" дописує JSON-рядки в TRACE_FILE, "otlp" надсилає на TRACE_OTLP_ENDPOINT
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'False') == 'True'
+TRACE_SAMPLE_RATIO = float(os.getenv('TRACE_SAMPLE_RATIO', '0.01'))
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'file')
+TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+
+# Кеш задач і користувачів: локальний LRU (CACHE_LOCAL_TTL) перед спільним
+# рівнем CACHE_BACKEND ("redis", "memory" для тестів або "none")
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'none')
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', os.getenv('BROKER_URL', 'redis://redis:6379/0'))
+CACHE_TTL = float(os.getenv('CACHE_TTL', '60'))
+CACHE_LOCAL_TTL = float(os.getenv('CACHE_LOCAL_TTL', '5'))
+CACHE_LOCAL_SIZE = int(os.getenv('CACHE_LOCAL_SIZE', '10000'))
+
+# Стрічка змін задач (WebSocket/SSE): "memory" доставляє події лише в межах
+# процесу, "redis" розсилає їх між воркерами через pub/sub. Клієнт, що відстав
+# більш ніж на FEED_QUEUE_SIZE подій, відключається і має перечитати задачі
+FEED_BROKER = os.getenv('FEED_BROKER', 'memory')
+FEED_REDIS_URL = os.getenv('FEED_REDIS_URL', os.getenv('BROKER_URL', 'redis://redis:6379/0'))
+FEED_QUEUE_SIZE = int(os.getenv('FEED_QUEUE_SIZE', '100'))
+FEED_HEARTBEAT = float(os.getenv('FEED_HEARTBEAT', '15'))
+
+# Інкрементальна синхронізація (GET /tasks/changes): надгробки видалених задач
+# зберігаються SYNC_TOMBSTONE_RETENTION_DAYS днів; клієнт зі старішим курсором
+# отримує 410 і перечитує задачі повністю
+SYNC_TOMBSTONE_RETENTION_DAYS = float(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+SYNC_PURGE_INTERVAL = float(os.getenv('SYNC_PURGE_INTERVAL', '3600'))
@@ -1,10 +1,19 @@
-from typing import Any
+from contextlib import nullcontext
+from typing import Any, Optional
 from loguru import logger
 from traceback import format_exc
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
+from config import TRACING_ENABLED
+from tracing import start_span
+
+
+def commit_span():
+    # COMMIT не проходить через cursor.execute, тому окремого спану від
+    # інструментації SQLAlchemy для нього немає
+    return start_span("db.commit") if TRACING_ENABLED else nullcontext()
 
 
 @as_declarative()
@@ -28,37 +37,65 @@ class Base:
     def __tablename__(cls) -> str:
         return cls.__name__.lower()
 
-    async def save(self, db_session: AsyncSession):
+    @staticmethod
+    async def _flush_or_commit(db_session: AsyncSession):
+        # У режимі unit of work транзакцію комітить залежність get_db один раз
+        # наприкінці запиту, а методи моделі лише відправляють зміни в базу
+        if db_session.info.get("unit_of_work"):
+            await db_session.flush()
+        else:
+            with commit_span():
+                await db_session.commit()
+
+    async def save(self, db_session: AsyncSession, savepoint: bool = False, changes: Optional[dict] = None):
         """
         :param db_session:
+        :param savepoint: wrap the flush in a SAVEPOINT, so a failure rolls back only this operation
+        :param changes: attributes to set before the flush (inside the SAVEPOINT, if any)
         :return:
         """
         try:
-            db_session.add(self)
-            return await db_session.commit()
+            if savepoint:
+                # begin_nested() сам робить autoflush, тому зміни атрибутів мають іти
+                # всередині блоку, інакше UPDATE піде ще до SAVEPOINT
+                async with db_session.begin_nested():
+                    self._apply(changes)
+                    db_session.add(self)
+            else:
+                self._apply(changes)
+                db_session.add(self)
+            return await self._flush_or_commit(db_session)
         except SQLAlchemyError as ex:
             logger.error(format_exc())
             raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=repr(ex))
 
-    async def delete(self, db_session: AsyncSession):
+    def _apply(self, changes: Optional[dict]):
+        for k, v in (changes or {}).items():
+            setattr(self, k, v)
+
+    async def delete(self, db_session: AsyncSession, savepoint: bool = False):
         """
         :param db_session:
+        :param savepoint: wrap the delete in a SAVEPOINT
         :return:
         """
         try:
-            await db_session.delete(self)
-            await db_session.commit()
+            if savepoint:
+                async with db_session.begin_nested():
+                    await db_session.delete(self)
+            else:
+                await db_session.delete(self)
+            await self._flush_or_commit(db_session)
             return True
         except SQLAlchemyError as ex:
             logger.error(format_exc())
             raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=repr(ex))
 
-    async def update(self, db_session: AsyncSession, **kwargs):
+    async def update(self, db_session: AsyncSession, savepoint: bool = False, **kwargs):
         """
         :param db_session:
+        :param savepoint: wrap the update in a SAVEPOINT
         :param kwargs:
         :return:
         """
-        for k, v in kwargs.items():
-            setattr(self, k, v)
-        await self.save(db_session)
\ No newline at end of file
+        await self.save(db_session, savepoint=savepoint, changes=kwargs)
@@ -1,9 +1,24 @@
-from typing import AsyncGenerator
-from fastapi import HTTPException
+import time
+from typing import AsyncGenerator, Optional
+from fastapi import HTTPException, Request
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
+from config import (
+    DATABASE_URL,
+    READ_YOUR_WRITES_WINDOW,
+    REPLICA_CONNECT_TIMEOUT,
+    REPLICA_FAILURE_COOLDOWN,
+    REPLICA_STATEMENT_TIMEOUT,
+    REPLICA_URLS,
+    UNIT_OF_WORK,
+)
+from db_utils.base_model import commit_span
+from db_utils.replicas import RecentWrites, ReplicaSet, read_your_writes_until
+from cache import DB_WRITE_INFO_KEY, READ_YOUR_WRITES_INFO_KEY, entity_cache
+from change_feed import flush_events
+from models import flush_task_stats, stamp_changes
+from security import decode_access_token
 
 
 engine = create_async_engine(
@@ -13,13 +28,51 @@ engine = create_async_engine(
 )
 async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+# Сесії для читання працюють в autocommit: без BEGIN/COMMIT на кожен запит
+read_session = sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"),
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
+replicas = ReplicaSet(
+    REPLICA_URLS,
+    primary=engine.execution_options(isolation_level="AUTOCOMMIT"),
+    cooldown=REPLICA_FAILURE_COOLDOWN,
+    connect_timeout=REPLICA_CONNECT_TIMEOUT,
+    statement_timeout=REPLICA_STATEMENT_TIMEOUT,
+)
+
+recent_writes = RecentWrites(READ_YOUR_WRITES_WINDOW, backend=entity_cache.backend)
+
+
+def token_user_id(request: Request) -> Optional[int]:
+    # Лише для вибору primary/репліки: справжню перевірку токена робить get_current_user
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    return payload.get("uid") if payload else None
+
 
 # Dependency
-async def get_db() -> AsyncGenerator:
-    async with async_session() as session:
+async def get_db(request: Request) -> AsyncGenerator:
+    async with async_session(info={"unit_of_work": UNIT_OF_WORK, DB_WRITE_INFO_KEY: True}) as session:
         try:
             yield session
-            await session.commit()
+            await flush_task_stats(session)
+            # Останнім перед COMMIT: рядок sync_state блокується до кінця транзакції
+            await stamp_changes(session)
+            with commit_span():
+                await session.commit()
+            await flush_events(session)
+            if session.info[DB_WRITE_INFO_KEY]:
+                # Наступні читання клієнта підуть на primary: за cookie
+                # (ReadYourWritesMiddleware) і за id користувача з токена
+                request.state.db_write = True
+                user_id = token_user_id(request) if replicas else None
+                if user_id is not None:
+                    await recent_writes.mark(user_id)
         except SQLAlchemyError as sql_ex:
             await session.rollback()
             raise sql_ex
@@ -27,4 +80,34 @@ async def get_db() -> AsyncGenerator:
             await session.rollback()
             raise http_ex
         finally:
+            # І після відкату: без unit of work моделі могли вже закомітити зміни
+            await entity_cache.flush_invalidations(session)
             await session.close()
+
+
+# Dependency for read-only routes: never issues COMMIT. Goes to a replica
+# when there is one, unless the client (by cookie or by the user id in its
+# token) wrote something in the last few seconds
+async def get_read_db(request: Request) -> AsyncGenerator:
+    session = None
+    in_write_window = read_your_writes_until(request.cookies) > time.time()
+    if replicas and not in_write_window:
+        user_id = token_user_id(request)
+        in_write_window = user_id is not None and await recent_writes.until(user_id) > time.time()
+    if replicas and not in_write_window:
+        session = await replicas.open_session()
+    if session is None:
+        # У вікні read-your-writes кеш пропускається: читання йде прямо в primary
+        session = read_session(info={READ_YOUR_WRITES_INFO_KEY: in_write_window})
+    async with session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def open_export_session() -> AsyncSession:
+    # Довгий експорт не повинен тримати з'єднання і знімок primary: він іде на репліку,
+    # а на primary - лише коли реплік немає або всі недоступні
+    session = await replicas.open_session(autocommit=False) if replicas else None
+    return session if session is not None else async_session()
@@ -0,0 +1,210 @@
+import itertools
+import time
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from cache import TTLCache
+
+READ_YOUR_WRITES_COOKIE = "pyjira_rw"
+RECENT_WRITE_KEY = "rw:user:{}"
+
+
+def replica_connect_args(url: str, connect_timeout: float, statement_timeout: float) -> dict:
+    # Таймаути потрібні лише asyncpg; SQLite (тести) працює без них
+    if make_url(url).drivername != "postgresql+asyncpg":
+        return {}
+    return {
+        "timeout": connect_timeout,
+        "server_settings": {"statement_timeout": str(int(statement_timeout * 1000))},
+    }
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Read session on a replica. When a statement fails with OperationalError
+    (the replica went away or hit its statement timeout) the replica is
+    marked down and the statement is re-run on the primary; reads are in
+    autocommit, so nothing else has to be replayed.
+    """
+
+    async def _fall_back(self, error: OperationalError) -> None:
+        replica_set, index = self.info.pop("replica_set"), self.info.pop("replica")
+        replica_set.mark_down(index, error)
+        await self.invalidate()
+        self.bind = replica_set.primary
+        self.sync_session.bind = replica_set.primary.sync_engine
+
+    async def _with_fallback(self, method, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        except OperationalError as error:
+            if "replica_set" not in self.info:
+                raise
+            await self._fall_back(error)
+            return await method(self, *args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._with_fallback(AsyncSession.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._with_fallback(AsyncSession.scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await self._with_fallback(AsyncSession.scalars, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._with_fallback(AsyncSession.get, *args, **kwargs)
+
+
+class ReplicaSet:
+    """
+    Read replicas picked round-robin. A replica that fails to hand out a
+    connection or to run a statement is skipped for `cooldown` seconds; the
+    read falls back to `primary`, as do all reads while every replica is down.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        primary: AsyncEngine,
+        cooldown: float = 30.0,
+        connect_timeout: float = 2.0,
+        statement_timeout: float = 5.0,
+    ):
+        self.cooldown = cooldown
+        self.urls = urls
+        self.primary = primary
+        self.engines = [
+            create_async_engine(
+                url,
+                future=True,
+                echo=False,
+                connect_args=replica_connect_args(url, connect_timeout, statement_timeout),
+            )
+            for url in urls
+        ]
+        self.sessions = [
+            sessionmaker(
+                engine.execution_options(isolation_level="AUTOCOMMIT"),
+                expire_on_commit=False,
+                class_=ReplicaSession,
+            )
+            for engine in self.engines
+        ]
+        # Для серверних курсорів (експорт): asyncpg відкриває курсор лише в транзакції
+        self.transaction_sessions = [
+            sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+            for engine in self.engines
+        ]
+        self.down_until = [0.0] * len(urls)
+        self._counter = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.urls)
+
+    def mark_down(self, index: int, error: Exception) -> None:
+        self.down_until[index] = time.monotonic() + self.cooldown
+        logger.warning(f"Replica {index} is unavailable for {self.cooldown}s: {error!r}")
+
+    def _candidates(self) -> List[int]:
+        now = time.monotonic()
+        start = next(self._counter)
+        order = [(start + offset) % len(self.urls) for offset in range(len(self.urls))]
+        return [index for index in order if self.down_until[index] <= now]
+
+    async def open_session(self, autocommit: bool = True) -> Optional[AsyncSession]:
+        """
+        Session on the next healthy replica with a connection already
+        checked out, so a dead replica is detected before the route runs.
+        With autocommit=False the session runs in one transaction and does not
+        fall back to the primary on errors (for streaming with a server-side cursor).
+        """
+        for index in self._candidates():
+            if autocommit:
+                session = self.sessions[index](info={"replica": index, "replica_set": self})
+            else:
+                session = self.transaction_sessions[index](info={"replica": index})
+            try:
+                await session.connection()
+                return session
+            except (OSError, SQLAlchemyError) as error:
+                await session.close()
+                self.mark_down(index, error)
+        return None
+
+
+def read_your_writes_until(cookies: dict) -> float:
+    try:
+        return float(cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+class RecentWrites:
+    """
+    Read-your-writes window keyed on the authenticated user, for clients that
+    do not keep cookies (API scripts, CLI tools). Marks live in a per-process
+    TTL cache and, when a cache backend is configured, in the shared backend
+    too, so a write served by one worker pins the user's reads on every
+    worker. Without a backend the window only holds within one worker.
+    """
+
+    def __init__(self, window: float, backend=None, maxsize: int = 10000):
+        self.window = window
+        self.backend = backend
+        self.local = TTLCache(maxsize=maxsize, ttl=window)
+
+    async def mark(self, user_id: int) -> None:
+        until = time.time() + self.window
+        self.local.set(user_id, until)
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(RECENT_WRITE_KEY.format(user_id), f"{until:.3f}".encode(), self.window, None)
+        except Exception as e:
+            # Запис уже закомічено; у гіршому разі інший воркер прочитає з репліки
+            logger.warning(f"Failed to share write window of user {user_id}: {e!r}")
+
+    async def until(self, user_id: int) -> float:
+        until = self.local.get(user_id, None)
+        if until is not None or self.backend is None:
+            return until or 0.0
+        try:
+            raw, _ = await self.backend.get(RECENT_WRITE_KEY.format(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to read write window of user {user_id}: {e!r}")
+            return 0.0
+        return float(raw) if raw else 0.0
+
+
+class ReadYourWritesMiddleware:
+    """
+    Sets a short-lived cookie on responses to requests that opened a write
+    session, so the client's next reads within `window` seconds go to the
+    primary and see its own changes despite replication lag.
+    """
+
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and scope.get("state", {}).get("db_write"):
+                until = time.time() + self.window
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={until:.3f}; Max-Age={int(self.window) + 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -2,14 +2,21 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from security import decode_access_token
-from db_utils.conn import get_db
+from db_utils.conn import get_read_db
 from sqlalchemy.orm import Session
 
 from models import User
+from schemas import CurrentUser
+from enums import UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-async def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def get_current_user(db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)):
+    return await authenticate_token(db, token)
+
+
+async def authenticate_token(db: Session, token: str) -> CurrentUser:
+    # Окремо від залежності: WebSocket передає токен у query-параметрі
     payload = decode_access_token(token)
     if payload is None:
         raise HTTPException(
@@ -17,20 +24,32 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(o
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    username: str = payload.get("sub")
-    if username is None:
+    username = payload.get("sub")
+    user_id = payload.get("uid")
+    role = payload.get("role")
+    token_version = payload.get("ver")
+    if username is None or user_id is None or role is None or token_version is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = await User.get_user_by_username(db, username)
-    if user is None:
+    current_version = await User.get_token_version(db, user_id)
+    if current_version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    return user
+    if current_version != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Дані підписані нами, тому повторна валідація не потрібна
+    return CurrentUser.model_construct(
+        id=user_id, username=username, role=UserRole(role)
+    )
 
 def role_checker(*roles: str):
     async def _role_checker(user: User = Depends(get_current_user)):
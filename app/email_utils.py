@@ -1,25 +1,95 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import List, Optional
+from loguru import logger
+from celery.signals import worker_process_shutdown
 from .celery_app import celery_app
-from .config import MAIL_USERNAME, MAIL_PASSWORD, MAIL_FROM, MAIL_PORT, MAIL_SERVER
+from .config import MAIL_FROM, MAIL_MAX_RETRIES
+from .smtp_pool import get_smtp_pool
 
 
-@celery_app.task(name='send_email_task')
-def send_email_task(email_to: str, subject: str, body: str):
-
+def build_message(email_to: str, subject: str, body: str) -> MIMEMultipart:
     msg = MIMEMultipart()
     msg['From'] = MAIL_FROM
     msg['To'] = email_to
     msg['Subject'] = subject
-    
+
     msg.attach(MIMEText(body, 'html'))
+    return msg
+
+
+def message_reply_code(error: smtplib.SMTPException) -> Optional[int]:
+    """
+    SMTP reply code of an error about one message (refused sender, recipient
+    or data); None for connection-level errors, e.g. a failed reconnect.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        # Якщо хоч один отримувач відкладений (4xx), лист варто повторити
+        return min(code for code, _ in error.recipients.values())
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return error.smtp_code
+    return None
 
+
+def deliver_emails(messages: List[dict]) -> List[dict]:
+    """
+    Sends the messages over one pooled SMTP connection. A message the server
+    rejects with a 5xx reply is logged and dropped; one deferred with a 4xx
+    reply is kept for a retry and the rest of the batch is still sent.
+    :return: messages to retry: deferred ones and those left unsent because
+        the connection failed
+    """
+    deferred = []
+    done = 0
+    pool = get_smtp_pool()
     try:
-        with smtplib.SMTP(MAIL_SERVER, MAIL_PORT) as server:
-            server.starttls()
-            server.login(MAIL_USERNAME, MAIL_PASSWORD)
-            server.sendmail(MAIL_FROM, email_to, msg.as_string())
+        with pool.connection() as connection:
+            for message in messages:
+                msg = build_message(
+                    message['email_to'], message['subject'], message['body']
+                )
+                try:
+                    pool.send(connection, MAIL_FROM, message['email_to'], msg.as_string())
+                except smtplib.SMTPException as e:
+                    code = message_reply_code(e)
+                    if code is None:
+                        raise
+                    if code >= 500:
+                        # Повтор не допоможе: сервер остаточно відхилив саме цей лист
+                        logger.error(f"Email to {message['email_to']} rejected: {e!r}")
+                    else:
+                        logger.warning(f"Email to {message['email_to']} deferred: {e!r}")
+                        deferred.append(message)
+                done += 1
 
     except Exception as e:
-        print(f"Failed to send email: {e}")
\ No newline at end of file
+        logger.error(f"Failed to send email: {e!r}")
+    return deferred + messages[done:]
+
+
+def retry_countdown(retries: int) -> int:
+    # Експоненційна затримка між повторами: 2, 4, 8 ... але не більше 10 хвилин
+    return min(2 ** (retries + 1), 600)
+
+
+@celery_app.task(name='send_email_task', bind=True, max_retries=MAIL_MAX_RETRIES)
+def send_email_task(self, email_to: str, subject: str, body: str):
+    if deliver_emails([{'email_to': email_to, 'subject': subject, 'body': body}]):
+        raise self.retry(countdown=retry_countdown(self.request.retries))
+
+
+@celery_app.task(name='send_email_batch_task', bind=True, max_retries=MAIL_MAX_RETRIES)
+def send_email_batch_task(self, messages: List[dict]):
+    # Усі листи пакета надсилаються через одне SMTP-з'єднання,
+    # а при збої повторюються лише ненадіслані й відкладені сервером
+    unsent = deliver_emails(messages)
+    if unsent:
+        raise self.retry(
+            args=(unsent,), countdown=retry_countdown(self.request.retries)
+        )
+
+
+@worker_process_shutdown.connect
+def close_smtp_pool(**kwargs):
+    get_smtp_pool().close()
@@ -0,0 +1,77 @@
+import hashlib
+from typing import Iterable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+
+
+def assignees_stamp(users: Iterable[dict]) -> str:
+    """Digest of the assignees a response embeds (dicts of UserResponse fields)."""
+    digest = hashlib.blake2b(digest_size=6)
+    for user in sorted(users, key=lambda user: user["id"]):
+        role = getattr(user["role"], "value", user["role"])
+        digest.update(f"{user['id']}:{user['username']}:{user['email']}:{role};".encode())
+    return digest.hexdigest()
+
+
+def task_etag(version: int, variant: str = "", assignees: Optional[Iterable[dict]] = None) -> str:
+    # Сильний ETag (придатний для If-Match): версія задачі, набір полів (fields/expand)
+    # і стан вбудованих виконавців - зміна їхніх даних не збільшує версію задачі
+    parts = [str(version)]
+    if variant:
+        parts.append(variant)
+    if assignees is not None:
+        parts.append(assignees_stamp(assignees))
+    return '"{}"'.format("-".join(parts))
+
+
+def page_etag(
+    tasks: Iterable[Tuple[int, int, Optional[Iterable[dict]]]], next_id: Optional[int], variant: str = ""
+) -> str:
+    """ETag of a page from its (id, version, embedded assignees or None) and the next page cursor."""
+    digest = hashlib.blake2b(digest_size=12)
+    for task_id, version, assignees in tasks:
+        stamp = assignees_stamp(assignees) if assignees is not None else ""
+        digest.update(f"{task_id}:{version}:{stamp},".encode())
+    digest.update(f"next:{next_id};{variant}".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def fields_variant(columns, assignees: Optional[str]) -> str:
+    if columns is None:
+        return ""
+    raw = ",".join(sorted(columns)) + f";{assignees}"
+    return hashlib.blake2b(raw.encode(), digest_size=4).hexdigest()
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    # If-None-Match порівнюється слабко: W/ не враховується
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def if_match_version(header: Optional[str]) -> Optional[int]:
+    """Task version from an If-Match header; None when there is no precondition."""
+    if not header or header.strip() == "*":
+        return None
+    tag = header.split(",")[0].strip()
+    # If-Match порівнюється строго (RFC 9110): слабкий тег не збігається ні з чим
+    if tag.startswith("W/"):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match requires a strong ETag",
+        )
+    try:
+        return int(tag.strip('"').split("-")[0])
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Invalid If-Match"
+        )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
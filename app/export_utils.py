@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Optional
+
+from db_utils.conn import open_export_session
+from models import Task
+
+EXPORT_FIELDS = ["id", "name", "description", "status", "priority", "creator_id", "assignees"]
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _plain(task: dict) -> dict:
+    return {
+        **task,
+        "status": task["status"].value,
+        "priority": task["priority"].value,
+    }
+
+
+async def _task_chunks(creator_id: Optional[int]) -> AsyncIterator[List[dict]]:
+    # Сесія залежності закривається до початку стрімінгу,
+    # тому генератор відкриває власну (на репліці, якщо вона є)
+    async with await open_export_session() as session:
+        async for chunk in Task.stream_tasks(
+            session, creator_id=creator_id, chunk_size=EXPORT_CHUNK_SIZE
+        ):
+            yield chunk
+
+
+async def export_ndjson(creator_id: Optional[int] = None) -> AsyncIterator[str]:
+    async for chunk in _task_chunks(creator_id):
+        yield "".join(
+            json.dumps(_plain(task), ensure_ascii=False) + "\n" for task in chunk
+        )
+
+
+def _plain_rows(chunk: List[dict]):
+    for task in chunk:
+        task = _plain(task)
+        task["assignees"] = " ".join(str(user_id) for user_id in task["assignees"])
+        yield [task[field] for field in EXPORT_FIELDS]
+
+
+async def export_csv(creator_id: Optional[int] = None) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+
+    async for chunk in _task_chunks(creator_id):
+        buffer.seek(0)
+        buffer.truncate()
+        for task in _plain_rows(chunk):
+            writer.writerow(task)
+        yield buffer.getvalue()
@@ -1,12 +1,47 @@
 from fastapi import FastAPI
-import uvicorn
-from routers import users, tasks, auth
+from routers import users, tasks, auth, metrics
+from config import (
+    METRICS_ENABLED,
+    READ_YOUR_WRITES_WINDOW,
+    REPLICA_URLS,
+    TRACE_EXPORTER,
+    TRACE_FILE,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_SAMPLE_RATIO,
+    TRACING_ENABLED,
+)
 
 app = FastAPI()
 app.include_router(users.router)
 app.include_router(tasks.router)
 app.include_router(auth.router)
 
+if REPLICA_URLS:
+    from db_utils.replicas import ReadYourWritesMiddleware
+
+    app.add_middleware(ReadYourWritesMiddleware, window=READ_YOUR_WRITES_WINDOW)
+
+if METRICS_ENABLED:
+    from db_utils.conn import engine, replicas
+    from metrics import MetricsMiddleware, instrument_engine
+
+    instrument_engine(engine)
+    for index, replica_engine in enumerate(replicas.engines):
+        instrument_engine(replica_engine, name=f"replica{index}")
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+
+if TRACING_ENABLED:
+    from db_utils.conn import engine, replicas
+    from tracing import configure_tracing, instrument_app
+
+    configure_tracing(
+        "pyjira-api", TRACE_SAMPLE_RATIO, TRACE_EXPORTER, TRACE_FILE, TRACE_OTLP_ENDPOINT
+    )
+    instrument_app(app, engine, *replicas.engines)
+
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -0,0 +1,221 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import event
+
+from cache import entity_cache
+from config import SLOW_REQUEST_MS
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Тривалість SSE-потоків: хвилини й години, а не мілісекунди
+STREAM_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 14400.0)
+
+STREAM_CONTENT_TYPES = (b"text/event-stream",)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "sql")
+
+    def __init__(self, collect_sql: bool):
+        self.statements = 0
+        self.db_time = 0.0
+        self.sql: Optional[List[str]] = [] if collect_sql else None
+
+
+# Статистика поточного запиту; SQLAlchemy передає контекст у свої greenlet-и
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+request_latency: Dict[Tuple[str, str], Histogram] = {}
+stream_duration: Dict[str, Histogram] = {}
+requests_total: Dict[Tuple[str, str, int], int] = {}
+db_statements_total: Dict[str, int] = {}
+db_time_total: Dict[str, float] = {}
+statement_latency = Histogram()
+
+# Пули з'єднань за іменем engine: primary і кожна репліка
+_engines: Dict[str, object] = {}
+
+
+def instrument_engine(engine, name: str = "primary"):
+    """
+    Counts statements and DB time per request and keeps a global statement
+    latency histogram. `engine` is the AsyncEngine from db_utils.conn or one
+    of the replica engines; its pool gauges are labelled with `name`.
+    """
+    _engines[name] = engine
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        statement_latency.observe(elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+            if stats.sql is not None:
+                stats.sql.append(f"{elapsed * 1000:.1f}ms {statement[:500]}")
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (cheaper than BaseHTTPMiddleware) recording latency,
+    status and DB usage per route template. WebSockets are not timed; for
+    event streams (SSE) the latency is the time to the response headers and
+    the stream's lifetime goes to a separate histogram.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict] = None
+
+    def _route_path(self, scope) -> str:
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(collect_sql=SLOW_REQUEST_MS > 0)
+        token = current_request.set(stats)
+        status_code = 500
+        headers_sent_at = None
+        is_stream = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, headers_sent_at, is_stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers_sent_at = time.perf_counter()
+                is_stream = any(
+                    name.lower() == b"content-type" and value.startswith(STREAM_CONTENT_TYPES)
+                    for name, value in message.get("headers", [])
+                )
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finished = time.perf_counter()
+            current_request.reset(token)
+
+            method, route = scope["method"], self._route_path(scope)
+            if is_stream:
+                # Час життя потоку - не затримка запиту: інакше він спотворив би гістограми
+                elapsed = headers_sent_at - start
+                stream_duration.setdefault(route, Histogram(STREAM_BUCKETS)).observe(finished - headers_sent_at)
+            else:
+                elapsed = finished - start
+            request_latency.setdefault((method, route), Histogram()).observe(elapsed)
+            key = (method, route, status_code)
+            requests_total[key] = requests_total.get(key, 0) + 1
+            db_statements_total[route] = db_statements_total.get(route, 0) + stats.statements
+            db_time_total[route] = db_time_total.get(route, 0.0) + stats.db_time
+
+            if SLOW_REQUEST_MS > 0 and elapsed * 1000 >= SLOW_REQUEST_MS:
+                logger.warning(
+                    "Slow request {} {} ({:.1f}ms, {} SQL statements, {:.1f}ms in DB)\n{}",
+                    method,
+                    scope["path"],
+                    elapsed * 1000,
+                    stats.statements,
+                    stats.db_time * 1000,
+                    "\n".join(stats.sql),
+                )
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def _render_histogram(lines: List[str], name: str, histogram: Histogram, **labels):
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f"{name}_bucket{{{_labels(**labels, le=le)}}} {cumulative}")
+    suffix = f"{{{_labels(**labels)}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+
+
+def render_metrics() -> str:
+    lines = [
+        "# HELP http_request_duration_seconds Request latency per route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in request_latency.items():
+        _render_histogram(lines, "http_request_duration_seconds", histogram, method=method, route=route)
+
+    lines += [
+        "# HELP http_stream_duration_seconds Lifetime of event streams (SSE) per route.",
+        "# TYPE http_stream_duration_seconds histogram",
+    ]
+    for route, histogram in stream_duration.items():
+        _render_histogram(lines, "http_stream_duration_seconds", histogram, route=route)
+
+    lines += ["# HELP http_requests_total Requests per route and status.", "# TYPE http_requests_total counter"]
+    for (method, route, status_code), count in requests_total.items():
+        lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status_code)}}} {count}")
+
+    lines += ["# HELP db_statements_total SQL statements executed per route.", "# TYPE db_statements_total counter"]
+    for route, count in db_statements_total.items():
+        lines.append(f"db_statements_total{{{_labels(route=route)}}} {count}")
+
+    lines += ["# HELP db_time_seconds_total Time spent in SQL per route.", "# TYPE db_time_seconds_total counter"]
+    for route, seconds in db_time_total.items():
+        lines.append(f"db_time_seconds_total{{{_labels(route=route)}}} {seconds}")
+
+    lines += ["# HELP db_statement_duration_seconds SQL statement latency.", "# TYPE db_statement_duration_seconds histogram"]
+    _render_histogram(lines, "db_statement_duration_seconds", statement_latency)
+
+    pools = {name: engine.pool for name, engine in _engines.items() if hasattr(engine.pool, "checkedout")}
+    for name, help_text, value in (
+        ("db_pool_size", "Configured pool size.", lambda pool: pool.size()),
+        ("db_pool_checked_out", "Connections currently checked out.", lambda pool: pool.checkedout()),
+        ("db_pool_overflow", "Connections opened above the pool size.", lambda pool: max(pool.overflow(), 0)),
+    ):
+        if pools:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for engine_name, pool in pools.items():
+            lines.append(f"{name}{{{_labels(engine=engine_name)}}} {value(pool)}")
+
+    if entity_cache.enabled:
+        lines += ["# HELP cache_hits_total Entity cache hits per tier.", "# TYPE cache_hits_total counter"]
+        for tier, count in entity_cache.hits.items():
+            lines.append(f"cache_hits_total{{{_labels(tier=tier)}}} {count}")
+        for name, help_text, kind, value in (
+            ("cache_misses_total", "Entity cache misses in both tiers.", "counter", entity_cache.misses),
+            ("cache_evictions_total", "Entries evicted from the local LRU tier.", "counter", entity_cache.evictions),
+            ("cache_local_entries", "Entries in the local tier.", "gauge", len(entity_cache.local)),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+    return "\n".join(lines) + "\n"
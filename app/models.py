@@ -1,19 +1,48 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Table
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    Enum,
+    Table,
+    JSON,
+    DateTime,
+    Index,
+    bindparam,
+    case,
+    event,
+    false,
+    func,
+    literal,
+    literal_column,
+    text,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship, Session
-from sqlalchemy.sql.expression import select
+from sqlalchemy.sql.expression import delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException, status
 from db_utils.base_model import Base
-from security import hash_password, verify_password
+from security import hash_password_async, verify_and_update_password_async
 from enums import TaskStatus, TaskPriority, UserRole
 import sys
 import pathlib
-from typing import List, Optional
+from collections import Counter
+from traceback import format_exc
+from typing import AsyncIterator, List, Optional, Tuple
 
 sys.path.append(str(pathlib.Path(__file__).resolve(strict=True).parent.parent))
 
 
-from app.email_utils import send_email_task
 from schemas import (
+    AuthenticatedUser,
+    BulkItemResult,
+    TaskBulkUpdateItem,
     UserCreate,
     UserLogin,
     UserResponse,
@@ -22,14 +51,58 @@ from schemas import (
     TaskResponse,
 )
 from loguru import logger
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
+from cache import DB_WRITE_INFO_KEY, MISSING, TTLCache, entity_cache
+from change_feed import (
+    CREATED,
+    DELETED,
+    UPDATED,
+    pending_events,
+    publish_after_commit,
+    task_event,
+)
+from config import (
+    OUTBOX_MAX_ATTEMPTS,
+    TOKEN_VERSION_CACHE_SIZE,
+    TOKEN_VERSION_CACHE_TTL,
+    TRACING_ENABLED,
+)
+from tracing import inject_context
+from search import add_search_vector, postgres_search_query, search_index, tokenize
+from serialization import (
+    USER_FIELDS,
+    task_adapter,
+    task_from_json,
+    task_from_orm,
+    user_adapter,
+    user_from_json,
+)
+
+# Версії токенів користувачів: user_id -> token_version (None, якщо користувача видалено)
+token_version_cache = TTLCache(
+    maxsize=TOKEN_VERSION_CACHE_SIZE, ttl=TOKEN_VERSION_CACHE_TTL
+)
+
+
+def task_cache_key(task_id: int) -> str:
+    return f"task:{task_id}"
+
+
+def user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def username_cache_key(username: str) -> str:
+    return f"user:name:{username}"
 
 # Таблиця для зв'язку Task і User (Many-to-Many)
 task_user_table = Table(
     "task_user",
     Base.metadata,
-    Column("task_id", Integer, ForeignKey("tasks.id")),
-    Column("user_id", Integer, ForeignKey("users.id")),
+    Column("task_id", Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    # Зворотний індекс для пошуку задач виконавця (User.tasks, фільтр assignee_id)
+    Index("ix_task_user_user_id_task_id", "user_id", "task_id"),
 )
 
 
@@ -42,6 +115,8 @@ class User(Base):
     password = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False)
     role = Column(Enum(UserRole), default=UserRole.USER, nullable=False)
+    # Збільшується при зміні або видаленні користувача, щоб відкликати видані токени
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     @classmethod
     async def create_user(cls, db: Session, user: UserCreate) -> UserResponse:
@@ -56,7 +131,7 @@ class User(Base):
                 detail="Email is already registered",
             )
 
-        user.password = hash_password(user.password)
+        user.password = await hash_password_async(user.password)
         new_user = cls(**user.model_dump())
 
         await new_user.save(db)
@@ -72,14 +147,28 @@ class User(Base):
         if not existing_user:
             return None
 
-        await existing_user.update(db, **user.model_dump())
+        old_username = existing_user.username
+        changes = user.model_dump(exclude_unset=True, exclude_none=True)
+        if "password" in changes:
+            changes["password"] = await hash_password_async(changes["password"])
+        await existing_user.update(
+            db, **changes, token_version=existing_user.token_version + 1
+        )
+        token_version_cache.pop(user_id)
+        await cls._invalidate_user_cache(
+            db,
+            user_id,
+            old_username,
+            existing_user.username,
+            touch_tasks=bool(changes.keys() & set(UserResponse.model_fields)),
+        )
 
         return UserResponse.model_validate(existing_user)
 
     @classmethod
     async def authenticate_user(
         cls, db: Session, user: UserLogin
-    ) -> Optional[UserResponse]:
+    ) -> Optional[AuthenticatedUser]:
         query = select(cls).where(cls.username == user.username)
         result = await db.execute(query)
         db_user = result.scalars().first()
@@ -87,30 +176,60 @@ class User(Base):
         if not db_user:
             return None
 
-        if not verify_password(user.password, db_user.password):
+        verified, new_hash = await verify_and_update_password_async(
+            user.password, db_user.password
+        )
+        if not verified:
             return None
 
-        return UserResponse.model_validate(db_user)
+        # Прозоро оновлюємо хеш, якщо змінились параметри схеми хешування
+        if new_hash:
+            await db_user.update(db, password=new_hash)
+            db.info[DB_WRITE_INFO_KEY] = True
+
+        return AuthenticatedUser.model_validate(db_user)
 
     @classmethod
-    async def get_user_by_id(cls, db: Session, user_id: int) -> Optional[UserResponse]:
-        query = select(cls).where(cls.id == user_id)
-        result = await db.execute(query)
+    async def _invalidate_user_cache(
+        cls, db: Session, user_id: int, *usernames: str, touch_tasks: bool = True
+    ):
+        keys = [user_cache_key(user_id), *(username_cache_key(name) for name in usernames)]
+        if touch_tasks and entity_cache.enabled:
+            # Задачі вбудовують виконавців у TaskResponse: їхні записи в кеші застаріли.
+            # Версії задач не змінюються - дані виконавців входять у ETag окремо
+            query = select(task_user_table.c.task_id).where(task_user_table.c.user_id == user_id)
+            keys += [task_cache_key(task_id) for task_id in (await db.execute(query)).scalars()]
+        entity_cache.invalidate_after_commit(db, keys)
+
+    @classmethod
+    async def _load_user(cls, db: Session, condition) -> Optional[UserResponse]:
+        result = await db.execute(select(cls).where(condition))
         user = result.scalars().first()
         if not user:
             return None
         return UserResponse.model_validate(user)
 
+    @classmethod
+    async def get_user_by_id(cls, db: Session, user_id: int) -> Optional[UserResponse]:
+        return await entity_cache.read_through(
+            db,
+            user_cache_key(user_id),
+            lambda: cls._load_user(db, cls.id == user_id),
+            user_adapter.dump_json,
+            user_from_json,
+        )
+
     @classmethod
     async def get_user_by_username(
         cls, db: Session, username: str
     ) -> Optional[UserResponse]:
-        query = select(cls).where(cls.username == username)
-        result = await db.execute(query)
-        user = result.scalars().first()
-        if not user:
-            return None
-        return UserResponse.model_validate(user)
+        return await entity_cache.read_through(
+            db,
+            username_cache_key(username),
+            lambda: cls._load_user(db, cls.username == username),
+            user_adapter.dump_json,
+            user_from_json,
+        )
 
     @classmethod
     async def delete_user(cls, db: Session, user_id: int) -> Optional[UserResponse]:
@@ -121,10 +240,31 @@ class User(Base):
         if not user:
             return None
 
+        # Виконавців треба знайти до видалення: каскад прибере рядки task_user
+        await cls._invalidate_user_cache(db, user_id, user.username)
+        # Ті самі рядки task_user зникають і з лічильників виконавця
+        await db.execute(
+            delete(TaskStat).where(
+                TaskStat.dimension == TaskStat.BY_ASSIGNEE, TaskStat.subject_id == user_id
+            )
+        )
         await user.delete(db)
+        token_version_cache.pop(user_id)
 
         return user
 
+    @classmethod
+    async def get_token_version(cls, db: Session, user_id: int) -> Optional[int]:
+        # Версія кешується на TOKEN_VERSION_CACHE_TTL секунд, тож більшість
+        # запитів автентифікуються без звернення до бази
+        token_version = token_version_cache.get(user_id)
+        if token_version is MISSING:
+            query = select(cls.token_version).where(cls.id == user_id)
+            result = await db.execute(query)
+            token_version = result.scalar_one_or_none()
+            token_version_cache.set(user_id, token_version)
+        return token_version
+
 
 # Модель задачі
 class Task(Base):
@@ -136,10 +276,31 @@ class Task(Base):
     status = Column(Enum(TaskStatus), default=TaskStatus.TODO, nullable=False)
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
 
-    creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    creator_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Збільшується при кожній зміні задачі: ETag і перевірка If-Match
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    # Номер останньої зміни в глобальній послідовності (SyncState), курсор GET /tasks/changes
+    change_seq = Column(BigInteger, default=0, server_default="0", nullable=False, index=True)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
 
     creator = relationship("User", back_populates="created_tasks")
-    assignees = relationship("User", secondary=task_user_table, back_populates="tasks")
+    # Рядки task_user видаляє база (ON DELETE CASCADE), ORM не завантажує їх для видалення
+    assignees = relationship(
+        "User", secondary=task_user_table, back_populates="tasks", passive_deletes=True
+    )
+
+    __table_args__ = (Index("ix_tasks_status_priority", "status", "priority"),)
+
+    def stats_state(self) -> tuple:
+        # Те, від чого залежать лічильники TaskStat (assignees мають бути завантажені)
+        return (
+            self.creator_id,
+            self.status,
+            self.priority,
+            [assignee.id for assignee in self.assignees],
+        )
 
     @classmethod
     async def create_task(cls, db: Session, task) -> TaskResponse:
@@ -157,11 +318,25 @@ class Task(Base):
         )
 
         await new_task.save(db)
+        publish_after_commit(
+            db, [task_event(CREATED, new_task.id, new_task.creator_id, new_task.version)]
+        )
+        TaskStat.count_change(db, after=new_task.stats_state())
 
-        return TaskResponse.model_validate(new_task)
+        return task_from_orm(new_task)
 
     @classmethod
     async def get_task_by_id(cls, db: Session, task_id: int) -> Optional[TaskResponse]:
+        return await entity_cache.read_through(
+            db,
+            task_cache_key(task_id),
+            lambda: cls._load_task(db, task_id),
+            task_adapter.dump_json,
+            task_from_json,
+        )
+
+    @classmethod
+    async def _load_task(cls, db: Session, task_id: int) -> Optional[TaskResponse]:
         query = (
             select(cls).options(selectinload(cls.assignees)).where(cls.id == task_id)
         )
@@ -169,78 +344,858 @@ class Task(Base):
         task = result.scalars().first()
         if not task:
             return None
-        return TaskResponse.model_validate(task)
+        return task_from_orm(task)
 
     @classmethod
-    async def get_tasks(cls, db: Session) -> List[TaskResponse]:
-        query = select(cls).options(selectinload(cls.assignees))
-        result = await db.execute(query)
-        tasks = result.scalars().all()
-        return [TaskResponse.model_validate(task) for task in tasks]
+    def _filter_tasks(
+        cls,
+        query,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+        status: Optional[TaskStatus] = None,
+        priority: Optional[TaskPriority] = None,
+        creator_id: Optional[int] = None,
+        assignee_id: Optional[int] = None,
+    ):
+        if status is not None:
+            query = query.where(cls.status == status)
+        if priority is not None:
+            query = query.where(cls.priority == priority)
+        if creator_id is not None:
+            query = query.where(cls.creator_id == creator_id)
+        if assignee_id is not None:
+            query = query.where(
+                select(task_user_table.c.task_id)
+                .where(
+                    task_user_table.c.task_id == cls.id,
+                    task_user_table.c.user_id == assignee_id,
+                )
+                .exists()
+            )
+
+        # Keyset-пагінація по id: сторінка N коштує стільки ж, скільки перша
+        if descending:
+            if after_id is not None:
+                query = query.where(cls.id < after_id)
+            return query.order_by(cls.id.desc())
+        if after_id is not None:
+            query = query.where(cls.id > after_id)
+        return query.order_by(cls.id.asc())
+
+    @staticmethod
+    def _split_page(items: list, limit: int) -> Tuple[list, Optional[int]]:
+        # Запит бере на один рядок більше, щоб дізнатися, чи є наступна сторінка
+        if len(items) > limit:
+            items = items[:limit]
+            return items, items[-1].id
+        return items, None
+
+    @classmethod
+    async def get_tasks(
+        cls, db: Session, limit: int, **filters
+    ) -> Tuple[List[TaskResponse], Optional[int]]:
+        query = cls._filter_tasks(select(cls).options(selectinload(cls.assignees)), **filters)
+        result = await db.execute(query.limit(limit + 1))
+        tasks, next_id = cls._split_page(result.scalars().all(), limit)
+        return [task_from_orm(task) for task in tasks], next_id
+
+    @classmethod
+    async def get_task_rows(
+        cls,
+        db: Session,
+        limit: int,
+        columns: List[str],
+        assignees: Optional[str] = None,
+        **filters,
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Sparse version of get_tasks: selects only `columns` (id is always
+        included) and loads assignees only when `assignees` is "ids" or "expand".
+        """
+        query = cls._filter_tasks(cls._columns_query(columns), **filters)
+        result = await db.execute(query.limit(limit + 1))
+        rows, next_id = cls._split_page(result.all(), limit)
+        rows = [dict(row._mapping) for row in rows]
+        await cls._attach_assignees(db, rows, assignees)
+        return rows, next_id
+
+    @classmethod
+    async def get_task_fields(
+        cls, db: Session, task_id: int, columns: List[str], assignees: Optional[str] = None
+    ) -> Optional[dict]:
+        result = await db.execute(cls._columns_query(columns).where(cls.id == task_id))
+        row = result.first()
+        if row is None:
+            return None
+        rows = [dict(row._mapping)]
+        await cls._attach_assignees(db, rows, assignees)
+        return rows[0]
+
+    @classmethod
+    async def get_task_version(
+        cls, db: Session, task_id: int, assignees: Optional[str] = None
+    ) -> Optional[dict]:
+        """version and creator_id for a 304 answer, plus embedded assignees with expand."""
+        # Лише індексні пошуки за ключами: без ORM-об'єктів і серіалізації
+        result = await db.execute(
+            select(cls.id, cls.version, cls.creator_id).where(cls.id == task_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        rows = [dict(row._mapping)]
+        await cls._attach_assignees(db, rows, "expand" if assignees == "expand" else None)
+        return rows[0]
+
+    @classmethod
+    async def get_page_versions(
+        cls, db: Session, limit: int, assignees: Optional[str] = None, **filters
+    ) -> Tuple[List[Tuple[int, int, Optional[List[dict]]]], Optional[int]]:
+        """(id, version, embedded assignees) of the page get_tasks would return, for the list ETag."""
+        query = cls._filter_tasks(select(cls.id, cls.version), **filters)
+        result = await db.execute(query.limit(limit + 1))
+        rows, next_id = cls._split_page(result.all(), limit)
+        rows = [dict(row._mapping) for row in rows]
+        await cls._attach_assignees(db, rows, "expand" if assignees == "expand" else None)
+        return [(row["id"], row["version"], row.get("assignees")) for row in rows], next_id
+
+    @classmethod
+    def _columns_query(cls, columns: List[str]):
+        names = dict.fromkeys(name for name in columns if name != "id")
+        return select(cls.id, *(getattr(cls, name) for name in names))
+
+    @classmethod
+    async def _attach_assignees(cls, db: Session, rows: List[dict], assignees: Optional[str]):
+        if not assignees or not rows:
+            return
+        by_task = {row["id"]: row for row in rows}
+        for row in rows:
+            row["assignees"] = []
+        if assignees == "ids":
+            query = select(task_user_table.c.task_id, task_user_table.c.user_id).where(
+                task_user_table.c.task_id.in_(by_task)
+            )
+            for task_id, user_id in await db.execute(query):
+                by_task[task_id]["assignees"].append(user_id)
+        else:
+            # Лише поля UserResponse, без хешів паролів і ORM-об'єктів
+            query = (
+                select(task_user_table.c.task_id, User.id, User.username, User.email, User.role)
+                .join(User, User.id == task_user_table.c.user_id)
+                .where(task_user_table.c.task_id.in_(by_task))
+            )
+            for task_id, *user in await db.execute(query):
+                by_task[task_id]["assignees"].append(dict(zip(USER_FIELDS, user)))
 
     @classmethod
     async def get_tasks_by_creator(
-        cls, db: Session, creator_id: int
-    ) -> List[TaskResponse]:
+        cls, db: Session, creator_id: int, limit: int, **filters
+    ) -> Tuple[List[TaskResponse], Optional[int]]:
+        return await cls.get_tasks(db, limit, creator_id=creator_id, **filters)
+
+    @classmethod
+    async def stream_tasks(
+        cls, db: Session, creator_id: Optional[int] = None, chunk_size: int = 1000
+    ) -> AsyncIterator[List[dict]]:
+        # Серверний курсор: у пам'яті тримається лише один чанк рядків
+        query = (
+            select(
+                cls.id,
+                cls.name,
+                cls.description,
+                cls.status,
+                cls.priority,
+                cls.creator_id,
+            )
+            .order_by(cls.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        if creator_id is not None:
+            query = query.where(cls.creator_id == creator_id)
+
+        result = await db.stream(query)
+        async for rows in result.mappings().partitions():
+            task_ids = [row["id"] for row in rows]
+            # Виконавці підтягуються одним запитом на чанк, а не на кожен рядок
+            assignees_query = select(
+                task_user_table.c.task_id, task_user_table.c.user_id
+            ).where(task_user_table.c.task_id.in_(task_ids))
+            assignees_result = await db.execute(assignees_query)
+            assignees = {}
+            for task_id, user_id in assignees_result:
+                assignees.setdefault(task_id, []).append(user_id)
+
+            yield [
+                {**row, "assignees": assignees.get(row["id"], [])} for row in rows
+            ]
+
+    @classmethod
+    async def get_task_for_update(cls, db: Session, task_id: int) -> Optional["Task"]:
+        # Одне завантаження задачі разом з автором (для листа) і виконавцями
         query = (
             select(cls)
-            .where(cls.creator_id == creator_id)
-            .options(selectinload(cls.assignees))
+            .options(joinedload(cls.creator), selectinload(cls.assignees))
+            .where(cls.id == task_id)
         )
         result = await db.execute(query)
-        tasks = result.scalars().all()
-        return [TaskResponse.model_validate(task) for task in tasks]
+        return result.scalars().first()
 
     @classmethod
-    async def update_task(cls, db: Session, task_id: int, task) -> TaskResponse:
-        task_query = (
-            select(cls).options(selectinload(cls.assignees)).where(cls.id == task_id)
+    async def update_task(
+        cls,
+        db: Session,
+        existing_task: "Task",
+        task: TaskUpdate,
+        expected_version: Optional[int] = None,
+    ) -> TaskResponse:
+        """
+        :param expected_version: version from If-Match; the update is applied
+            only if the task still has it, otherwise 412 is raised
+        """
+        changes = task.model_dump(
+            exclude_unset=True, exclude_none=True, exclude={"assignees"}
+        )
+
+        # Виконавці оновлюються різницею: flush видаляє та додає лише змінені рядки task_user
+        assignees = None
+        if task.assignees:
+            wanted_ids = set(task.assignees)
+            current_ids = {assignee.id for assignee in existing_task.assignees}
+            added_ids = wanted_ids - current_ids
+
+            added = []
+            if added_ids:
+                assignees_query = select(User).where(User.id.in_(added_ids))
+                assignees_result = await db.execute(assignees_query)
+                added = assignees_result.scalars().all()
+
+                if len(added) != len(added_ids):
+                    raise HTTPException(
+                        status_code=400, detail="One or more assignees not found"
+                    )
+
+            if added or current_ids - wanted_ids:
+                assignees = [
+                    assignee
+                    for assignee in existing_task.assignees
+                    if assignee.id in wanted_ids
+                ] + list(added)
+
+        if not changes and assignees is None:
+            if expected_version is not None and existing_task.version != expected_version:
+                raise HTTPException(status_code=412, detail="Task has been modified")
+            return task_from_orm(existing_task)
+
+        before = existing_task.stats_state()
+        # Оптимістичне блокування: версія перевіряється в самому UPDATE, без SELECT ... FOR UPDATE
+        query = update(cls).where(cls.id == existing_task.id)
+        if expected_version is not None:
+            query = query.where(cls.version == expected_version)
+        query = (
+            query.values(**changes, version=cls.version + 1)
+            .returning(cls)
+            .execution_options(populate_existing=True)
         )
-        task_result = await db.execute(task_query)
-        existing_task = task_result.scalars().first()
+        # RETURNING з populate_existing оновлює existing_task без окремого SELECT
+        if (await db.execute(query)).scalars().first() is None:
+            raise HTTPException(status_code=412, detail="Task has been modified")
 
-        if not existing_task:
-            raise HTTPException(status_code=404, detail="Task not found")
+        if assignees is not None:
+            await existing_task.update(db, assignees=assignees)
 
-        # Use the Base update method to update the fields
-        await existing_task.update(
+        entity_cache.invalidate_after_commit(db, [task_cache_key(existing_task.id)])
+        publish_after_commit(
             db,
-            name=task.name,
-            description=task.description,
-            status=task.status,
-            priority=task.priority,
+            [task_event(UPDATED, existing_task.id, existing_task.creator_id, existing_task.version)],
         )
+        TaskStat.count_change(db, before, existing_task.stats_state())
+        return task_from_orm(existing_task)
 
-        # Update the assignees if provided
-        if task.assignees:
-            assignees_query = select(User).where(User.id.in_(task.assignees))
-            assignees_result = await db.execute(assignees_query)
-            assignees = assignees_result.scalars().all()
+    @classmethod
+    async def bulk_create_tasks(
+        cls, db: Session, tasks: List[TaskCreate], creator_id: int
+    ) -> List[BulkItemResult]:
+        # Усі id виконавців перевіряються одним запитом
+        requested_ids = {user_id for task in tasks for user_id in task.assignees}
+        existing_ids = set()
+        if requested_ids:
+            result = await db.execute(select(User.id).where(User.id.in_(requested_ids)))
+            existing_ids = set(result.scalars().all())
+
+        results = [None] * len(tasks)
+        valid = []
+        for index, task in enumerate(tasks):
+            missing = set(task.assignees) - existing_ids
+            if missing:
+                results[index] = BulkItemResult(
+                    index=index,
+                    ok=False,
+                    error=f"Assignees not found: {sorted(missing)}",
+                )
+            else:
+                valid.append((index, task))
 
-            if len(assignees) != len(task.assignees):
+        if valid:
+            rows = [
+                {
+                    "name": task.name,
+                    "description": task.description,
+                    "status": task.status or TaskStatus.TODO,
+                    "priority": task.priority or TaskPriority.MEDIUM,
+                    "creator_id": creator_id,
+                }
+                for _, task in valid
+            ]
+            try:
+                # Багаторядковий INSERT ... RETURNING id у порядку вхідних рядків
+                insert_query = insert(cls).returning(
+                    cls.id, sort_by_parameter_order=True
+                )
+                result = await db.execute(insert_query, rows)
+                new_ids = result.scalars().all()
+
+                links = [
+                    {"task_id": task_id, "user_id": user_id}
+                    for task_id, (_, task) in zip(new_ids, valid)
+                    for user_id in set(task.assignees)
+                ]
+                if links:
+                    await db.execute(insert(task_user_table), links)
+            except SQLAlchemyError as ex:
+                logger.error(format_exc())
                 raise HTTPException(
-                    status_code=400, detail="One or more assignees not found"
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=repr(ex)
                 )
 
-            existing_task.assignees = assignees
-            await existing_task.save(db)
+            for task_id, (index, _) in zip(new_ids, valid):
+                results[index] = BulkItemResult(index=index, ok=True, id=task_id)
+            for (_, task), row in zip(valid, rows):
+                TaskStat.count_change(
+                    db,
+                    after=(creator_id, row["status"], row["priority"], set(task.assignees)),
+                )
+            publish_after_commit(
+                db, [task_event(CREATED, task_id, creator_id, 1) for task_id in new_ids]
+            )
+
+        return results
+
+    @classmethod
+    async def bulk_update_tasks(
+        cls, db: Session, items: List[TaskBulkUpdateItem], user
+    ) -> Tuple[List[BulkItemResult], List[dict]]:
+        query = (
+            select(cls.id, cls.name, cls.status, cls.priority, cls.creator_id, User.email)
+            .join(User, User.id == cls.creator_id)
+            .where(cls.id.in_({item.id for item in items}))
+        )
+        result = await db.execute(query)
+        existing = {row.id: row for row in result}
+
+        results = []
+        # Зміни групуються за набором значень, щоб виконати по одному UPDATE на групу
+        groups = {}
+        status_changes = []
+        for index, item in enumerate(items):
+            task = existing.get(item.id)
+            if task is None:
+                results.append(
+                    BulkItemResult(index=index, ok=False, id=item.id, error="Task not found")
+                )
+                continue
+            if user.role == UserRole.USER and task.creator_id != user.id:
+                results.append(
+                    BulkItemResult(
+                        index=index,
+                        ok=False,
+                        id=item.id,
+                        error="You do not have access to this task",
+                    )
+                )
+                continue
+
+            changes = item.model_dump(exclude={"id"}, exclude_none=True)
+            if changes:
+                groups.setdefault(tuple(sorted(changes.items())), []).append(item.id)
+            if item.status is not None and item.status != task.status:
+                status_changes.append(
+                    {
+                        "task_id": task.id,
+                        "name": task.name,
+                        "status": item.status.value,
+                        "recipients": [task.email],
+                    }
+                )
+            results.append(BulkItemResult(index=index, ok=True, id=item.id))
+
+        # Підсумковий стан кожної зміненої задачі (для лічильників TaskStat)
+        final = {}
+        for changes, task_ids in groups.items():
+            update_query = (
+                update(cls)
+                .where(cls.id.in_(task_ids))
+                .values(**dict(changes), version=cls.version + 1)
+                .returning(cls.id, cls.creator_id, cls.version, cls.status, cls.priority)
+                .execution_options(synchronize_session=False)
+            )
+            updated = (await db.execute(update_query)).all()
+            final.update((row.id, row) for row in updated)
+            entity_cache.invalidate_after_commit(db, map(task_cache_key, task_ids))
+            publish_after_commit(
+                db, [task_event(UPDATED, row.id, row.creator_id, row.version) for row in updated]
+            )
 
-        return TaskResponse.model_validate(existing_task)
+        regrouped = [
+            task_id
+            for task_id, row in final.items()
+            if (row.status, row.priority)
+            != (existing[task_id].status, existing[task_id].priority)
+        ]
+        changed = {change["task_id"]: change for change in status_changes}
+        if changed or regrouped:
+            # Виконавці (id для лічильників, email для сповіщень) одним запитом на весь пакет
+            assignees_query = (
+                select(task_user_table.c.task_id, task_user_table.c.user_id, User.email)
+                .join(User, User.id == task_user_table.c.user_id)
+                .where(task_user_table.c.task_id.in_(changed.keys() | set(regrouped)))
+            )
+            assignee_ids = {}
+            for task_id, user_id, email in await db.execute(assignees_query):
+                assignee_ids.setdefault(task_id, []).append(user_id)
+                if task_id in changed:
+                    changed[task_id]["recipients"].append(email)
+            for task_id in regrouped:
+                task, row = existing[task_id], final[task_id]
+                assignees = assignee_ids.get(task_id, [])
+                TaskStat.count_change(
+                    db,
+                    (task.creator_id, task.status, task.priority, assignees),
+                    (task.creator_id, row.status, row.priority, assignees),
+                )
+
+        return results, status_changes
 
     @classmethod
     async def delete_task(cls, db: Session, task_id: int) -> Optional[TaskResponse]:
-        query = select(cls).where(cls.id == task_id)
+        # Виконавці потрібні для відповіді, тому завантажуються разом із задачею
+        query = (
+            select(cls).options(selectinload(cls.assignees)).where(cls.id == task_id)
+        )
         result = await db.execute(query)
         task = result.scalars().first()
 
         if not task:
             return None
 
+        TaskStat.count_change(db, before=task.stats_state())
         await task.delete(db)
+        entity_cache.invalidate_after_commit(db, [task_cache_key(task_id)])
+        publish_after_commit(db, [task_event(DELETED, task.id, task.creator_id, task.version)])
+
+        return task_from_orm(task)
+
+    @classmethod
+    async def get_changes(
+        cls, db: Session, since: int, limit: int, creator_id: Optional[int] = None
+    ) -> Tuple[List[TaskResponse], List[int], int, bool]:
+        """
+        Tasks changed and deleted after change number `since`, at most `limit`
+        of both together, in change order.
+
+        :return: (updated tasks, deleted task ids, last change number returned, has_more)
+        """
+        # Зміни й надгробки читаються одним запитом, тобто з одного знімка: у двох
+        # autocommit-запитах зміна N могла б потрапити між ними і курсор пропустив би її.
+        # Обидві гілки йдуть індексом change_seq: вартість залежить від кількості змін, а не задач
+        tasks_changes = select(
+            cls.change_seq, cls.id.label("task_id"), false().label("deleted")
+        ).where(cls.change_seq > since)
+        tombstones_changes = select(
+            TaskTombstone.change_seq, TaskTombstone.task_id, true().label("deleted")
+        ).where(TaskTombstone.change_seq > since)
+        if creator_id is not None:
+            tasks_changes = tasks_changes.where(cls.creator_id == creator_id)
+            tombstones_changes = tombstones_changes.where(TaskTombstone.creator_id == creator_id)
+        changes_query = (
+            union_all(tasks_changes, tombstones_changes)
+            .order_by(literal_column("change_seq"))
+            .limit(limit + 1)
+        )
+        changes = (await db.execute(changes_query)).all()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
 
-        return task
+        updated_ids = [change.task_id for change in changes if not change.deleted]
+        tasks = {}
+        if updated_ids:
+            # Задача могла змінитися ще раз після знімка: клієнт отримає новіший стан,
+            # а ця зміна прийде повторно в наступній відповіді
+            query = select(cls).options(selectinload(cls.assignees)).where(cls.id.in_(updated_ids))
+            tasks = {task.id: task for task in (await db.execute(query)).scalars().all()}
+
+        # Задача, видалена після знімка, прийде надгробком у наступній відповіді
+        updated = [task_from_orm(tasks[task_id]) for task_id in updated_ids if task_id in tasks]
+        deleted = [change.task_id for change in changes if change.deleted]
+        last_seq = changes[-1].change_seq if changes else since
+        return updated, deleted, last_seq, has_more
+
+    @classmethod
+    async def search(
+        cls, db: Session, q: str, limit: int, creator_id: Optional[int] = None
+    ) -> List[TaskResponse]:
+        """Tasks whose name or description contain every word of `q` as a prefix, best first."""
+        terms = tokenize(q)
+        if not terms:
+            return []
+        if db.get_bind().dialect.name == "postgresql":
+            query = postgres_search_query(cls, terms).options(selectinload(cls.assignees))
+            if creator_id is not None:
+                query = query.where(cls.creator_id == creator_id)
+            result = await db.execute(query.limit(limit))
+            return [task_from_orm(task) for task in result.scalars().all()]
+
+        # Без tsvector (SQLite): пошук в індексі процесу, потім задачі одним запитом
+        await search_index.refresh(db, cls, TaskTombstone, SyncState)
+        task_ids = search_index.search(terms, limit, creator_id)
+        if not task_ids:
+            return []
+        query = select(cls).options(selectinload(cls.assignees)).where(cls.id.in_(task_ids))
+        tasks = {task.id: task for task in (await db.execute(query)).scalars().all()}
+        return [task_from_orm(tasks[task_id]) for task_id in task_ids if task_id in tasks]
+
+
+add_search_vector(Task.__table__)
+
+
+# Надгробки видалених задач: клієнт синхронізації дізнається з них про видалення
+class TaskTombstone(Base):
+    __tablename__ = "task_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    creator_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    @classmethod
+    async def purge(cls, db: Session, older_than) -> int:
+        """Deletes tombstones older than `older_than` and moves the sync horizon past them."""
+        query = delete(cls).where(cls.deleted_at < older_than).returning(cls.change_seq)
+        purged = (await db.execute(query)).scalars().all()
+        if purged:
+            horizon = max(purged)
+            await db.execute(
+                update(SyncState)
+                .where(SyncState.id == SyncState.ROW_ID)
+                .values(
+                    purged_seq=case(
+                        (SyncState.purged_seq < horizon, horizon), else_=SyncState.purged_seq
+                    )
+                )
+            )
+        return len(purged)
+
+
+class SyncState(Base):
+    """
+    Single row with the global change sequence. Numbers are reserved by an
+    UPDATE of this row right before COMMIT, and the row lock is held until
+    the COMMIT, so changes become visible in sequence order. With a database
+    sequence a transaction could commit a smaller number after a client has
+    already synced past it, and that change would never be delivered.
+    """
+
+    __tablename__ = "sync_state"
+
+    ROW_ID = 1
+
+    id = Column(Integer, primary_key=True)
+    last_seq = Column(BigInteger, default=0, server_default="0", nullable=False)
+    # Надгробки з номерами до purged_seq включно видалено: старіші курсори недійсні
+    purged_seq = Column(BigInteger, default=0, server_default="0", nullable=False)
+
+    @classmethod
+    async def reserve(cls, db: Session, count: int) -> int:
+        """Reserves `count` consecutive change numbers and returns the first one."""
+        query = (
+            update(cls)
+            .where(cls.id == cls.ROW_ID)
+            .values(last_seq=cls.last_seq + count)
+            .returning(cls.last_seq)
+        )
+        last_seq = (await db.execute(query)).scalar_one()
+        return last_seq - count + 1
+
+    @classmethod
+    async def get_purged_seq(cls, db: Session) -> int:
+        query = select(cls.purged_seq).where(cls.id == cls.ROW_ID)
+        return (await db.execute(query)).scalar_one()
+
+
+# Рядок лічильника створюється разом із таблицею (create_all у тестах і бенчмарках)
+event.listen(
+    SyncState.__table__,
+    "after_create",
+    DDL("INSERT INTO sync_state (id, last_seq, purged_seq) VALUES (1, 0, 0)"),
+)
+
+
+async def stamp_changes(db: Session) -> None:
+    """
+    Gives every task changed in this transaction the next change numbers and
+    writes tombstones for deleted tasks. get_db calls it last, right before
+    COMMIT: the sync_state row is locked from SyncState.reserve until the
+    transaction ends, i.e. for the change_seq UPDATE, the tombstone INSERT
+    and the COMMIT (with its WAL flush).
+
+    The trade-off is global: every transaction that writes tasks takes the
+    same row lock, so task writes commit one at a time through this window.
+    That is what makes change numbers visible in order, and it caps task
+    write throughput at roughly one commit latency per transaction.
+    """
+    # Події стрічки змін - повний перелік задач, змінених транзакцією; вирішує остання подія задачі
+    latest = {}
+    for change in pending_events(db):
+        latest[change["task_id"]] = change
+    if not latest:
+        return
+
+    first_seq = await SyncState.reserve(db, len(latest))
+    changed, deleted = [], []
+    for seq, change in enumerate(latest.values(), start=first_seq):
+        if change["type"] == DELETED:
+            deleted.append(
+                {"task_id": change["task_id"], "creator_id": change["creator_id"], "change_seq": seq}
+            )
+        else:
+            changed.append({"changed_id": change["task_id"], "seq": seq})
+
+    if changed:
+        tasks = Task.__table__
+        await db.execute(
+            update(tasks)
+            .where(tasks.c.id == bindparam("changed_id"))
+            .values(change_seq=bindparam("seq")),
+            changed,
+        )
+    if deleted:
+        await db.execute(insert(TaskTombstone), deleted)
+
+
+# Кількість задач за статусом і пріоритетом для кожного автора і кожного виконавця.
+# Загальні підсумки - сума рядків авторів: окремого "гарячого" рядка, який оновлює
+# кожна транзакція, немає
+class TaskStat(Base):
+    __tablename__ = "task_stats"
+
+    BY_CREATOR = "creator"
+    BY_ASSIGNEE = "assignee"
+
+    dimension = Column(String(16), primary_key=True)
+    subject_id = Column(Integer, primary_key=True)
+    status = Column(Enum(TaskStatus), primary_key=True)
+    priority = Column(Enum(TaskPriority), primary_key=True)
+    count = Column(Integer, default=0, server_default="0", nullable=False)
+
+    @classmethod
+    def count_change(cls, db: Session, before: Optional[tuple] = None, after: Optional[tuple] = None):
+        """
+        Queues the counter deltas of one task change; get_db applies them
+        right before COMMIT (flush_task_stats).
+
+        :param before: (creator_id, status, priority, assignee ids) before the change, None for a new task
+        :param after: the same after the change, None for a deleted task
+        """
+        deltas = db.info.setdefault("task_stats", Counter())
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            creator_id, task_status, priority, assignee_ids = state
+            deltas[(cls.BY_CREATOR, creator_id, task_status, priority)] += sign
+            for user_id in assignee_ids:
+                deltas[(cls.BY_ASSIGNEE, user_id, task_status, priority)] += sign
+
+    @classmethod
+    async def get_stats(
+        cls, db: Session, group_by: Optional[str] = None, subject_id: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Counts by status and priority, per creator or per assignee (`group_by`)
+        or in total; reads only summary rows, never tasks.
+        """
+        dimension = group_by or cls.BY_CREATOR
+        count = func.sum(cls.count).label("count")
+        columns = [cls.status, cls.priority]
+        if group_by is not None:
+            columns.insert(0, cls.subject_id)
+        query = select(*columns, count).where(cls.dimension == dimension).group_by(*columns)
+        if subject_id is not None:
+            query = query.where(cls.subject_id == subject_id)
+        rows = (await db.execute(query)).all()
+        return [row._asdict() for row in rows if row.count]
+
+    @classmethod
+    def _grouped_counts(cls):
+        # Одне GROUP BY по задачах і їхніх виконавцях дає всі рядки таблиці
+        by_creator = select(
+            literal(cls.BY_CREATOR).label("dimension"),
+            Task.creator_id.label("subject_id"),
+            Task.status,
+            Task.priority,
+        )
+        by_assignee = select(
+            literal(cls.BY_ASSIGNEE).label("dimension"),
+            task_user_table.c.user_id.label("subject_id"),
+            Task.status,
+            Task.priority,
+        ).join(Task, Task.id == task_user_table.c.task_id)
+        memberships = union_all(by_creator, by_assignee).subquery()
+        return select(
+            memberships.c.dimension,
+            memberships.c.subject_id,
+            memberships.c.status,
+            memberships.c.priority,
+            func.count().label("count"),
+        ).group_by(
+            memberships.c.dimension,
+            memberships.c.subject_id,
+            memberships.c.status,
+            memberships.c.priority,
+        )
+
+    @classmethod
+    async def rebuild(cls, db: Session) -> int:
+        """Recomputes the whole table from tasks in one INSERT ... SELECT ... GROUP BY."""
+        if db.get_bind().dialect.name == "postgresql":
+            # Транзакції, що змінюють задачі, чекають на перерахунок: їхні дельти
+            # застосуються після нього, і жодна зміна не врахується двічі чи не загубиться
+            await db.execute(text("LOCK TABLE task_stats IN EXCLUSIVE MODE"))
+        await db.execute(delete(cls))
+        grouped = cls._grouped_counts()
+        await db.execute(
+            insert(cls).from_select(["dimension", "subject_id", "status", "priority", "count"], grouped)
+        )
+        return await db.scalar(select(func.count()).select_from(cls))
+
+    @classmethod
+    async def check(cls, db: Session) -> List[Tuple[tuple, int, int]]:
+        """Rows where the table differs from a fresh GROUP BY: (key, stored, actual)."""
+        actual = {
+            tuple(row[:4]): row.count for row in await db.execute(cls._grouped_counts())
+        }
+        stored_query = select(cls.dimension, cls.subject_id, cls.status, cls.priority, cls.count)
+        stored = {
+            tuple(row[:4]): row.count
+            for row in await db.execute(stored_query)
+            if row.count
+        }
+        return [
+            (key, stored.get(key, 0), actual.get(key, 0))
+            for key in sorted(stored.keys() | actual.keys(), key=str)
+            if stored.get(key, 0) != actual.get(key, 0)
+        ]
+
+
+async def flush_task_stats(db: Session) -> None:
+    """Applies the queued TaskStat deltas with one upsert; called by get_db before COMMIT."""
+    deltas = db.info.pop("task_stats", None)
+    if not deltas:
+        return
+    # Сталий порядок рядків: дві транзакції блокують спільні лічильники в тому самому порядку
+    rows = [
+        {"dimension": key[0], "subject_id": key[1], "status": key[2], "priority": key[3], "count": delta}
+        for key, delta in sorted(deltas.items(), key=lambda item: str(item[0]))
+        if delta
+    ]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    upsert = (postgresql_insert if dialect == "postgresql" else sqlite_insert)(TaskStat).values(rows)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=["dimension", "subject_id", "status", "priority"],
+        set_={"count": TaskStat.count + upsert.excluded["count"]},
+    )
+    await db.execute(upsert)
 
 
 # Відношення для користувача
 User.created_tasks = relationship("Task", back_populates="creator")
-User.tasks = relationship("Task", secondary=task_user_table, back_populates="assignees")
+User.tasks = relationship(
+    "Task", secondary=task_user_table, back_populates="assignees", passive_deletes=True
+)
+
+
+# Outbox сповіщень: записується в тій самій транзакції, що й зміна задачі,
+# а Celery-релей розсилає непрочитані записи пакетами
+class Notification(Base):
+    __tablename__ = "notification_outbox"
+
+    TASK_STATUS_CHANGED = "task_status_changed"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    # Dead letter: подія, яку не вдалося передати OUTBOX_MAX_ATTEMPTS разів
+    failed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_notification_outbox_unsent",
+            "id",
+            postgresql_where=sent_at.is_(None) & failed_at.is_(None),
+        ),
+    )
+
+    @classmethod
+    async def enqueue(cls, db: Session, kind: str, payloads: List[dict]) -> None:
+        if not payloads:
+            return
+        # Контекст трасування зберігається разом із подією, щоб релей міг зв'язати з нею свій спан
+        carrier = inject_context() if TRACING_ENABLED else None
+        if carrier:
+            payloads = [{**payload, "trace": carrier} for payload in payloads]
+        await db.execute(
+            insert(cls), [{"kind": kind, "payload": payload} for payload in payloads]
+        )
+
+    @classmethod
+    async def claim_batch(cls, db: Session, limit: int, after_id: int = 0) -> List["Notification"]:
+        # SKIP LOCKED дозволяє кільком релеям працювати паралельно без дублювання;
+        # after_id не дає одному запуску релею повторно брати щойно невдалі рядки
+        query = (
+            select(cls)
+            .where(cls.sent_at.is_(None), cls.failed_at.is_(None), cls.id > after_id)
+            .order_by(cls.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @classmethod
+    async def mark_sent(cls, db: Session, notification_ids: List[int]) -> None:
+        if not notification_ids:
+            return
+        await db.execute(
+            update(cls)
+            .where(cls.id.in_(notification_ids))
+            .values(sent_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    async def mark_failed(cls, db: Session, notification_ids: List[int]) -> None:
+        if not notification_ids:
+            return
+        await db.execute(
+            update(cls)
+            .where(cls.id.in_(notification_ids))
+            .values(
+                attempts=cls.attempts + 1,
+                failed_at=case((cls.attempts + 1 >= OUTBOX_MAX_ATTEMPTS, func.now()), else_=None),
+            )
+            .execution_options(synchronize_session=False)
+        )
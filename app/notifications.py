@@ -0,0 +1,108 @@
+# app/notifications.py
+import json
+from typing import Dict, List, Optional
+
+import redis
+from celery import group
+
+from .celery_app import celery_app
+from .config import (
+    MAIL_MAX_RETRIES,
+    NOTIFY_DIGEST_WINDOW,
+    NOTIFY_FANOUT_CHUNK,
+    NOTIFY_REDIS_URL,
+)
+from .email_utils import deliver_emails, retry_countdown
+
+DIGEST_EVENTS_KEY = "notify:digest:events:{}"
+DIGEST_PENDING_KEY = "notify:digest:pending:{}"
+
+_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(NOTIFY_REDIS_URL)
+    return _redis
+
+
+def group_by_recipient(events: List[dict]) -> Dict[str, List[dict]]:
+    # Кожен отримувач з'являється один раз, навіть якщо він і автор, і виконавець
+    by_recipient: Dict[str, List[dict]] = {}
+    for event in events:
+        payload = {key: value for key, value in event.items() if key not in ("recipients", "trace")}
+        for email in dict.fromkeys(event["recipients"]):
+            by_recipient.setdefault(email, []).append(payload)
+    return by_recipient
+
+
+def fan_out_task_events(events: List[dict]):
+    """
+    Splits a batch of task events between their recipients and queues one
+    collect task per NOTIFY_FANOUT_CHUNK recipients, so broker traffic grows
+    with the number of users rather than the number of events.
+    """
+    entries = list(group_by_recipient(events).items())
+    if not entries:
+        return
+    group(
+        collect_digest_events.s(entries[start:start + NOTIFY_FANOUT_CHUNK])
+        for start in range(0, len(entries), NOTIFY_FANOUT_CHUNK)
+    ).apply_async()
+
+
+@celery_app.task(name='collect_digest_events')
+def collect_digest_events(entries: List[list]):
+    client = get_redis()
+    pipeline = client.pipeline(transaction=False)
+    for email, events in entries:
+        pipeline.rpush(DIGEST_EVENTS_KEY.format(email), *(json.dumps(e) for e in events))
+        # Перша подія у вікні ставить прапорець і планує відправку дайджесту
+        pipeline.set(
+            DIGEST_PENDING_KEY.format(email), 1, nx=True, ex=NOTIFY_DIGEST_WINDOW * 2
+        )
+    replies = pipeline.execute()
+
+    for (email, _), scheduled in zip(entries, replies[1::2]):
+        if scheduled:
+            flush_digest.apply_async((email,), countdown=NOTIFY_DIGEST_WINDOW)
+
+
+def build_digest(events: List[dict]) -> dict:
+    # Якщо задача змінювалась кілька разів за вікно, у дайджест потрапляє останній статус
+    latest = {}
+    for event in events:
+        latest[event["task_id"]] = event
+    lines = "".join(
+        f"<li>Task {event['name']} with id {task_id} has changed status to {event['status']}</li>"
+        for task_id, event in latest.items()
+    )
+    if len(latest) == 1:
+        event = next(iter(latest.values()))
+        subject = f"Task {event['name']} status changed"
+    else:
+        subject = f"{len(latest)} tasks changed status"
+    return {"subject": subject, "body": f"<ul>{lines}</ul>"}
+
+
+@celery_app.task(name='flush_digest', bind=True, max_retries=MAIL_MAX_RETRIES)
+def flush_digest(self, email: str, events: Optional[List[dict]] = None):
+    if events is None:
+        client = get_redis()
+        # Спочатку знімаємо прапорець: подія, що прийде під час відправки,
+        # запланує новий дайджест замість того, щоб загубитися
+        client.delete(DIGEST_PENDING_KEY.format(email))
+        pipeline = client.pipeline()
+        pipeline.lrange(DIGEST_EVENTS_KEY.format(email), 0, -1)
+        pipeline.delete(DIGEST_EVENTS_KEY.format(email))
+        raw_events, _ = pipeline.execute()
+        events = [json.loads(raw) for raw in raw_events]
+    if not events:
+        return
+
+    if deliver_emails([{"email_to": email, **build_digest(events)}]):
+        # Події вже забрані з Redis, тому передаються в повтор явно
+        raise self.retry(
+            args=(email, events), countdown=retry_countdown(self.request.retries)
+        )
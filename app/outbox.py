@@ -0,0 +1,101 @@
+# app/outbox.py
+import asyncio
+import pathlib
+import sys
+from contextlib import nullcontext
+from typing import List, Tuple
+
+from kombu.exceptions import OperationalError
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from .celery_app import celery_app
+from .config import DATABASE_URL, OUTBOX_BATCH_SIZE, TRACING_ENABLED
+from .notifications import fan_out_task_events
+from .tracing import instrument_engine, linked_span
+
+# Моделі імпортують модулі застосунку як top-level (from db_utils ...),
+# тому воркеру потрібна тека app у sys.path
+sys.path.append(str(pathlib.Path(__file__).resolve(strict=True).parent))
+
+from models import Notification  # noqa: E402
+
+
+_engine = None
+
+
+def get_relay_engine():
+    # Кожен запуск задачі має власний event loop, тому з'єднання не пулуються;
+    # сам engine один на процес, щоб його можна було інструментувати один раз
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        if TRACING_ENABLED:
+            instrument_engine(_engine)
+    return _engine
+
+
+def relay_span(notifications: list):
+    if not TRACING_ENABLED:
+        return nullcontext()
+    return linked_span("outbox.relay", [n.payload.get("trace") for n in notifications])
+
+
+def publish_events(notifications: list) -> Tuple[List[int], List[int]]:
+    """
+    Hands task events to the digest pipeline.
+    :return: ids of published and of failed notifications
+    """
+    try:
+        fan_out_task_events([n.payload for n in notifications])
+        return [n.id for n in notifications], []
+    except OperationalError:
+        # Брокер недоступний: це не вина подій, спроби не рахуються
+        raise
+    except Exception as e:
+        logger.error(f"Failed to relay outbox batch: {e!r}")
+
+    # Зіпсована подія не повинна блокувати решту пакета
+    published, failed = [], []
+    for notification in notifications:
+        try:
+            fan_out_task_events([notification.payload])
+            published.append(notification.id)
+        except OperationalError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to relay outbox event {notification.id}: {e!r}")
+            failed.append(notification.id)
+    return published, failed
+
+
+async def relay_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Relays pending task events. Delivery is at least once: if the commit
+    after publishing fails, the rows stay pending and are published again
+    (a digest keeps one line per task, so such repeats usually collapse).
+    """
+    session = sessionmaker(get_relay_engine(), expire_on_commit=False, class_=AsyncSession)
+    relayed = 0
+    last_id = 0
+    async with session() as db:
+        while True:
+            notifications = await Notification.claim_batch(db, batch_size, after_id=last_id)
+            if not notifications:
+                break
+            last_id = notifications[-1].id
+
+            with relay_span(notifications):
+                published, failed = publish_events(notifications)
+                await Notification.mark_sent(db, published)
+                await Notification.mark_failed(db, failed)
+                await db.commit()
+                relayed += len(published)
+    return relayed
+
+
+@celery_app.task(name='relay_outbox_task')
+def relay_outbox_task():
+    return asyncio.run(relay_outbox())
@@ -1,12 +1,12 @@
 # app/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from users_db import fake_users_db
-from security import verify_password, create_access_token
+from security import create_access_token
 from datetime import timedelta
 from config import ACCESS_TOKEN_EXPIRE_MINUTES
 from models import User
 from db_utils.conn import get_db
+from cache import DB_WRITE_INFO_KEY
 from sqlalchemy.orm import Session
 from schemas import UserLogin
 
@@ -19,6 +19,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 async def login_for_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
+    # Вхід нічого не пише, якщо не довелось перехешувати пароль: тоді клієнт
+    # не закріплюється за primary на вікно read-your-writes
+    db.info[DB_WRITE_INFO_KEY] = False
     user = await User.authenticate_user(
         db, UserLogin(username=form_data.username, password=form_data.password)
     )
@@ -30,7 +33,12 @@ async def login_for_access_token(
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username},
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "role": user.role.value,
+            "ver": user.token_version,
+        },
         expires_delta=access_token_expires,
     )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,18 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from db_utils.conn import get_db
-from models import Task, User
-from schemas import TaskCreate, TaskResponse, TaskUpdate
+from db_utils.conn import get_db, get_read_db, read_session
+from models import Notification, SyncState, Task, TaskStat, User
+from schemas import (
+    BulkResult,
+    TaskBulkCreate,
+    TaskBulkUpdate,
+    TaskChanges,
+    TaskCreate,
+    TaskStats,
+    TaskPage,
+    TaskResponse,
+    TaskUpdate,
+)
 from loguru import logger
-from app.email_utils import send_email_task
-from dependencies import role_checker, get_current_user
-from enums import UserRole
-from typing import List, Optional
+from dependencies import authenticate_token, role_checker, get_current_user
+from enums import TaskPriority, TaskStatus, UserRole
+from typing import List, Literal, Optional
+from pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_change_cursor,
+    decode_cursor,
+    encode_change_cursor,
+    encode_cursor,
+)
 from config import USE_MAILING
+from export_utils import export_csv, export_ndjson
+from serialization import (
+    expanded_assignees,
+    parse_task_fields,
+    sparse_response,
+    task_changes_response,
+    task_list_response,
+    task_page_response,
+    task_assignees,
+    task_response,
+)
+from change_feed import broker, sse_stream, websocket_stream
+from etag import etag_matches, fields_variant, if_match_version, not_modified, page_etag, task_etag
 
 router = APIRouter()
 
 
+def without_extra_fields(row: dict, columns) -> dict:
+    # version і creator_id вибираються завжди (ETag, доступ), але повертаються лише на запит
+    for name in ("version", "creator_id"):
+        if name not in columns:
+            row.pop(name, None)
+    return row
+
+
 @router.post("/tasks/", response_model=TaskResponse)
 async def create_task(
     task: TaskCreate,
@@ -20,41 +59,256 @@ async def create_task(
     user: User = Depends(get_current_user),
 ):
     task.creator_id = user.id
-    return await Task.create_task(db, task)
+    return task_response(await Task.create_task(db, task))
+
+
+@router.post("/tasks/bulk", response_model=BulkResult)
+async def bulk_create_tasks(
+    payload: TaskBulkCreate,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    results = await Task.bulk_create_tasks(db, payload.items, user.id)
+    return BulkResult(results=results)
+
 
+@router.patch("/tasks/bulk", response_model=BulkResult)
+async def bulk_update_tasks(
+    payload: TaskBulkUpdate,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    results, status_changes = await Task.bulk_update_tasks(db, payload.items, user)
+    if status_changes and USE_MAILING is True:
+        # Події записуються в outbox тієї ж транзакції, релей розішле їх дайджестами
+        await Notification.enqueue(db, Notification.TASK_STATUS_CHANGED, status_changes)
+    return BulkResult(results=results)
 
-@router.get("/tasks", response_model=List[TaskResponse])
+
+@router.get("/tasks", response_model=TaskPage)
 async def get_tasks(
-    db: Session = Depends(get_db), user: User = Depends(get_current_user)
-) -> List[TaskResponse]:
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    creator_id: Optional[int] = None,
+    assignee_id: Optional[int] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated task fields, e.g. id,name,status"),
+    expand: Optional[Literal["assignees"]] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    columns, assignees = parse_task_fields(fields, expand)
+    variant = fields_variant(columns, assignees)
+    descending = order == "desc"
+    filters = dict(
+        after_id=decode_cursor(cursor, descending),
+        descending=descending,
+        status=status,
+        priority=priority,
+        assignee_id=assignee_id,
+    )
     if user.role == UserRole.USER:
-        return await Task.get_tasks_by_creator(db, user.id)
-    return await Task.get_tasks(db)
+        if creator_id is not None and creator_id != user.id:
+            raise HTTPException(
+                status_code=403, detail="You do not have access to these tasks"
+            )
+        creator_id = user.id
+
+    if if_none_match:
+        # Перевірка за (id, version) сторінки: без виконавців і серіалізації
+        versions, next_id = await Task.get_page_versions(
+            db, limit, assignees, creator_id=creator_id, **filters
+        )
+        etag = page_etag(versions, next_id, variant)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if columns is not None:
+        rows, next_id = await Task.get_task_rows(
+            db, limit, [*columns, "version"], assignees, creator_id=creator_id, **filters
+        )
+        etag = page_etag(
+            ((row["id"], row["version"], expanded_assignees(row, assignees)) for row in rows),
+            next_id,
+            variant,
+        )
+        next_cursor = encode_cursor(next_id, descending) if next_id is not None else None
+        items = [without_extra_fields(row, columns) for row in rows]
+        response = sparse_response({"items": items, "next_cursor": next_cursor})
+    else:
+        tasks, next_id = await Task.get_tasks(db, limit, creator_id=creator_id, **filters)
+        etag = page_etag(((task.id, task.version, task_assignees(task)) for task in tasks), next_id)
+        next_cursor = encode_cursor(next_id, descending) if next_id is not None else None
+        response = task_page_response(TaskPage.model_construct(items=tasks, next_cursor=next_cursor))
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.get("/tasks/export")
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user: User = Depends(get_current_user),
+):
+    creator_id = user.id if user.role == UserRole.USER else None
+    if format == "csv":
+        return StreamingResponse(
+            export_csv(creator_id),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="tasks.csv"'},
+        )
+    return StreamingResponse(export_ndjson(creator_id), media_type="application/x-ndjson")
+
+
+@router.get("/tasks/stats", response_model=TaskStats)
+async def get_task_stats(
+    group_by: Optional[Literal["creator", "assignee"]] = None,
+    subject_id: Optional[int] = Query(None, description="Only this creator's or assignee's counts"),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    if user.role == UserRole.USER:
+        # Як і в GET /tasks: користувач бачить лише власні задачі
+        if group_by == "assignee" or (subject_id is not None and subject_id != user.id):
+            raise HTTPException(
+                status_code=403, detail="You do not have access to these tasks"
+            )
+        subject_id = user.id
+    groups = await TaskStat.get_stats(db, group_by, subject_id)
+    return TaskStats(
+        group_by=group_by,
+        total=sum(group["count"] for group in groups) if group_by != "assignee" else None,
+        groups=groups,
+    )
+
+
+@router.get("/tasks/search", response_model=List[TaskResponse])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    # Ті самі правила доступу, що й у GET /tasks: USER шукає лише серед власних задач
+    creator_id = user.id if user.role == UserRole.USER else None
+    return task_list_response(await Task.search(db, q, limit, creator_id))
+
+
+@router.get("/tasks/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response; omit for a full sync"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    since_seq = decode_change_cursor(since)
+    if since_seq and since_seq < await SyncState.get_purged_seq(db):
+        # Надгробки після цього курсора вже видалено: видалення могли загубитися
+        raise HTTPException(
+            status_code=410, detail="Cursor has expired, reload tasks with GET /tasks"
+        )
+    creator_id = user.id if user.role == UserRole.USER else None
+    updated, deleted, last_seq, has_more = await Task.get_changes(
+        db, since_seq, limit, creator_id
+    )
+    return task_changes_response(
+        TaskChanges.model_construct(
+            updated=updated,
+            deleted=deleted,
+            cursor=encode_change_cursor(last_seq),
+            has_more=has_more,
+        )
+    )
+
+
+@router.get("/tasks/feed")
+async def task_feed(user: User = Depends(get_current_user)):
+    # Server-sent events: created/updated/deleted задачі, видимі користувачу
+    return StreamingResponse(
+        sse_stream(broker.subscribe(user)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/tasks/feed/ws")
+async def task_feed_ws(websocket: WebSocket, token: str = Query(...)):
+    # Браузер не може додати заголовок Authorization до WebSocket, тому токен у query.
+    # Сесія бази потрібна лише для перевірки токена і не тримається на весь час з'єднання
+    async with read_session() as db:
+        try:
+            user = await authenticate_token(db, token)
+        except HTTPException:
+            await websocket.close(code=1008)
+            return
+    await websocket.accept()
+    await websocket_stream(websocket, broker.subscribe(user))
 
 
 @router.get("/tasks/{task_id}", response_model=Optional[TaskResponse])
 async def get_task(
-    task_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)
+    task_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated task fields, e.g. id,name,status"),
+    expand: Optional[Literal["assignees"]] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
 ):
-    task = await Task.get_task_by_id(db, task_id)
+    columns, assignees = parse_task_fields(fields, expand)
+    variant = fields_variant(columns, assignees)
+    if if_none_match:
+        # Лише версія за первинним ключем (і виконавці для expand): без серіалізації
+        row = await Task.get_task_version(db, task_id, assignees)
+        if row is not None and (
+            row["creator_id"] == user.id or user.role in [UserRole.ADMIN, UserRole.MANAGER]
+        ):
+            etag = task_etag(row["version"], variant, row.get("assignees"))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    if columns is not None:
+        # creator_id потрібен для перевірки доступу, навіть якщо його не запитали
+        task = await Task.get_task_fields(
+            db, task_id, [*columns, "creator_id", "version"], assignees
+        )
+        creator_id, version = (task["creator_id"], task["version"]) if task else (None, None)
+        embedded = expanded_assignees(task, assignees) if task else None
+    else:
+        task = await Task.get_task_by_id(db, task_id)
+        creator_id, version = (task.creator_id, task.version) if task else (None, None)
+        embedded = task_assignees(task) if task else None
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    if task.creator_id != user.id and user.role not in [
+    if creator_id != user.id and user.role not in [
         UserRole.ADMIN,
         UserRole.MANAGER,
     ]:
         raise HTTPException(
             status_code=403, detail="You do not have access to this task"
         )
-    return task
+    if columns is not None:
+        response = sparse_response(without_extra_fields(task, columns))
+    else:
+        response = task_response(task)
+    response.headers["ETag"] = task_etag(version, variant, embedded)
+    return response
 
 
 @router.put(
     "/tasks/{task_id}",
     response_model=TaskResponse,
 )
-async def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    existing_task = await Task.get_task_by_id(db, task_id)
+async def update_task(
+    task_id: int,
+    task: TaskUpdate,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    expected_version = if_match_version(if_match)
+    existing_task = await Task.get_task_for_update(db, task_id)
     if not existing_task:
         raise HTTPException(status_code=404, detail="Task not found")
     if existing_task.creator_id != user.id and user.role not in [
@@ -64,14 +318,21 @@ async def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_
         raise HTTPException(
             status_code=403, detail="You do not have access to this task"
         )
-    updated_task = await Task.update_task(db, task_id, task)
-    if existing_task.status != updated_task.status and USE_MAILING is True:
-        creator = await User.get_user_by_id(db, updated_task.creator_id)
-        subject = f"Task {updated_task.name} status changed"
-        message = f"Task {updated_task.name} with id {updated_task.id} has changed status to {updated_task.status}"
-        send_email_task(creator.email, subject, message)
+    previous_status = existing_task.status
+    updated_task = await Task.update_task(db, existing_task, task, expected_version)
+    if previous_status != updated_task.status and USE_MAILING is True:
+        event = {
+            "task_id": updated_task.id,
+            "name": updated_task.name,
+            "status": updated_task.status.value,
+            "recipients": [existing_task.creator.email]
+            + [assignee.email for assignee in updated_task.assignees],
+        }
+        await Notification.enqueue(db, Notification.TASK_STATUS_CHANGED, [event])
 
-    return updated_task
+    response = task_response(updated_task)
+    response.headers["ETag"] = task_etag(updated_task.version, assignees=task_assignees(updated_task))
+    return response
 
 
 @router.delete(
@@ -83,4 +344,4 @@ async def delete_task(task_id: int, db: Session = Depends(get_db)):
     deleted_task = await Task.delete_task(db, task_id)
     if not deleted_task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return deleted_task
\ No newline at end of file
+    return task_response(deleted_task)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from db_utils.conn import get_db
+from db_utils.conn import get_db, get_read_db
 from models import User
 from schemas import UserCreate, UserResponse, UserUpdate
 from loguru import logger
@@ -16,7 +16,7 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     return await User.create_user(db, user)
 
 @router.get("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(role_checker(UserRole.ADMIN, UserRole.MANAGER))])
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: Session = Depends(get_read_db)):
     user = await User.get_user_by_id(db, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
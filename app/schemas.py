@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import List, Optional
 from enums import TaskStatus, TaskPriority, UserRole
+from config import BULK_MAX_ITEMS
 
 
 class UserResponse(BaseModel):
@@ -13,6 +14,17 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class AuthenticatedUser(UserResponse):
+    token_version: int
+
+
+class CurrentUser(BaseModel):
+    # Користувач, відновлений з підписаних claims токена без запиту до бази
+    id: int
+    username: str
+    role: UserRole
+
+
 class UserCreate(BaseModel):
     username: str
     password: str
@@ -44,6 +56,7 @@ class TaskResponse(BaseModel):
     status: TaskStatus
     priority: TaskPriority
     creator_id: int
+    version: int
     assignees: List[UserResponse]
 
     class Config:
@@ -67,4 +80,67 @@ class TaskUpdate(BaseModel):
     assignees: Optional[List[int]] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+class TaskStatsGroup(BaseModel):
+    subject_id: Optional[int] = None
+    status: TaskStatus
+    priority: TaskPriority
+    count: int
+
+
+class TaskStats(BaseModel):
+    group_by: Optional[str] = None
+    # Для group_by=assignee не рахується: задача з кількома виконавцями входить у кілька груп
+    total: Optional[int] = None
+    groups: List[TaskStatsGroup]
+
+
+class TaskChanges(BaseModel):
+    # Клієнт спершу застосовує deleted, потім updated, і зберігає cursor для наступного запиту
+    updated: List[TaskResponse]
+    deleted: List[int]
+    cursor: str
+    has_more: bool
+
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TaskBulkUpdateItem(BaseModel):
+    id: int
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, items: List[TaskBulkUpdateItem]) -> List[TaskBulkUpdateItem]:
+        # Інакше задача оновилася б двічі (дві версії, дві події), а результати
+        # за індексами перестали б відповідати задачам
+        seen, duplicates = set(), set()
+        for item in items:
+            (duplicates if item.id in seen else seen).add(item.id)
+        if duplicates:
+            raise ValueError(f"duplicate task ids: {sorted(duplicates)}")
+        return items
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
@@ -0,0 +1,214 @@
+import asyncio
+import bisect
+import heapq
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import DDL, event, false, func, literal_column, null, select, true, union_all
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+# Без стемінгу: назви задач пишуть різними мовами, префіксний пошук частково його замінює
+SEARCH_CONFIG = "simple"
+
+# Ваги як у ts_rank за замовчуванням: A (назва) = 1.0, B (опис) = 0.4
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Ті самі об'єкти, що створює міграція: звичайна колонка, яку заповнює тригер
+SEARCH_VECTOR_DDL = (
+    "ALTER TABLE tasks ADD COLUMN search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ "
+    "BEGIN "
+    "NEW.search_vector := "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'B'); "
+    "RETURN NEW; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER tasks_search_vector_update BEFORE INSERT OR UPDATE OF name, description "
+    "ON tasks FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()",
+)
+SEARCH_INDEX_DDL = "CREATE INDEX ix_tasks_search_vector ON tasks USING gin (search_vector)"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def to_prefix_tsquery(terms: List[str]) -> str:
+    # Кожне слово запиту - префікс, усі слова обов'язкові: "fix lo" -> "fix:* & lo:*"
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def add_search_vector(tasks_table) -> None:
+    """
+    Adds the trigger-maintained `search_vector` column and its GIN index when
+    the tasks table is created with create_all on Postgres (benchmarks); the
+    Alembic migration does the same for deployed databases. The column is
+    not mapped, so ordinary task queries never read it.
+    """
+    for ddl in (*SEARCH_VECTOR_DDL, SEARCH_INDEX_DDL):
+        event.listen(tasks_table, "after_create", DDL(ddl).execute_if(dialect="postgresql"))
+
+
+def postgres_search_query(task_model, terms: List[str]):
+    """SELECT of matching tasks ranked by ts_rank; uses the GIN index on search_vector."""
+    vector = literal_column("tasks.search_vector")
+    tsquery = func.to_tsquery(
+        literal_column(f"'{SEARCH_CONFIG}'").cast(REGCONFIG), to_prefix_tsquery(terms)
+    )
+    return (
+        select(task_model)
+        .where(vector.op("@@")(tsquery))
+        .order_by(func.ts_rank(vector, tsquery).desc(), task_model.id)
+    )
+
+
+class InvertedIndex:
+    """
+    In-memory search index for databases without full-text search (SQLite in
+    tests and local runs). It follows the task change sequence: every search
+    first applies tasks and tombstones changed since the last one, so it stays
+    consistent with the database without hooks in the write paths.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        # task_id -> (creator_id, change_seq, вага кожного слова)
+        self.documents: Dict[int, Tuple[int, int, Counter]] = {}
+        self.last_seq: Optional[int] = None
+        self._terms: List[str] = []
+        self._terms_dirty = False
+        # Одночасні пошуки не завантажують ті самі зміни двічі
+        self._lock = asyncio.Lock()
+
+    def clear(self) -> None:
+        self.postings.clear()
+        self.documents.clear()
+        self.last_seq = None
+        self._terms = []
+        self._terms_dirty = False
+
+    def add(
+        self,
+        task_id: int,
+        creator_id: int,
+        change_seq: int,
+        name: Optional[str],
+        description: Optional[str],
+    ) -> None:
+        self.remove(task_id)
+        weights: Counter = Counter()
+        for term in tokenize(name):
+            weights[term] += NAME_WEIGHT
+        for term in tokenize(description):
+            weights[term] += DESCRIPTION_WEIGHT
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self._terms_dirty = True
+            self.postings[term][task_id] = weight
+        self.documents[task_id] = (creator_id, change_seq, weights)
+
+    def remove(self, task_id: int) -> None:
+        document = self.documents.pop(task_id, None)
+        if document is None:
+            return
+        for term in document[2]:
+            postings = self.postings[term]
+            postings.pop(task_id, None)
+            if not postings:
+                del self.postings[term]
+                self._terms_dirty = True
+
+    def _expand(self, prefix: str) -> Iterable[str]:
+        # Відсортований словник: усі слова з префіксом лежать поспіль
+        if self._terms_dirty:
+            self._terms = sorted(self.postings)
+            self._terms_dirty = False
+        start = bisect.bisect_left(self._terms, prefix)
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def search(self, terms: List[str], limit: int, creator_id: Optional[int] = None) -> List[int]:
+        """Ids of tasks matching every term as a prefix, best matches first."""
+        scores: Optional[Dict[int, float]] = None
+        for prefix in terms:
+            matched: Dict[int, float] = {}
+            for term in self._expand(prefix):
+                for task_id, weight in self.postings[term].items():
+                    matched[task_id] = matched.get(task_id, 0.0) + weight
+            if scores is None:
+                scores = matched
+            else:
+                scores = {
+                    task_id: score + matched[task_id]
+                    for task_id, score in scores.items()
+                    if task_id in matched
+                }
+            if not scores:
+                return []
+        if creator_id is not None:
+            scores = {
+                task_id: score
+                for task_id, score in scores.items()
+                if self.documents[task_id][0] == creator_id
+            }
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [task_id for task_id, _ in ranked]
+
+    async def refresh(self, db, task_model, tombstone_model, sync_state_model) -> None:
+        """Applies changes committed since the last refresh (everything on the first call)."""
+        async with self._lock:
+            await self._refresh(db, task_model, tombstone_model, sync_state_model)
+
+    async def _refresh(self, db, task_model, tombstone_model, sync_state_model) -> None:
+        purged_seq = await sync_state_model.get_purged_seq(db)
+        if self.last_seq is not None and self.last_seq < purged_seq:
+            # Пропущені видалення вже не відновити з надгробків
+            self.clear()
+
+        since = -1 if self.last_seq is None else self.last_seq
+        query = select(
+            task_model.id,
+            task_model.creator_id,
+            task_model.name,
+            task_model.description,
+            task_model.change_seq,
+            false().label("deleted"),
+        ).where(task_model.change_seq > since)
+        if self.last_seq is not None:
+            # Задачі й надгробки одним запитом, тобто з одного знімка: інакше
+            # видалення між двома запитами загубилося б, а last_seq пішов би далі
+            query = union_all(
+                query,
+                select(
+                    tombstone_model.task_id,
+                    tombstone_model.creator_id,
+                    null(),
+                    null(),
+                    tombstone_model.change_seq,
+                    true(),
+                ).where(tombstone_model.change_seq > since),
+            )
+        rows = (await db.execute(query)).all()
+
+        last_seq = since
+        for row in rows:
+            if not row.deleted:
+                self.add(row.id, row.creator_id, row.change_seq, row.name, row.description)
+            last_seq = max(last_seq, row.change_seq)
+        for row in rows:
+            if row.deleted:
+                document = self.documents.get(row.id)
+                # SQLite може знову видати id видаленої задачі: новіша задача лишається
+                if document is not None and document[1] < row.change_seq:
+                    self.remove(row.id)
+        self.last_seq = last_seq
+
+
+search_index = InvertedIndex()
@@ -1,15 +1,28 @@
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
 from config import (
     SECRET_KEY,
     ALGORITHM,
+    HASHING_MAX_WORKERS,
+    HASHING_MAX_QUEUE,
+    BCRYPT_ROUNDS,
 )
 import jwt
 from jwt.exceptions import InvalidTokenError
 from loguru import logger
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Хеші з меншою кількістю раундів вважаються застарілими (needs_update)
+# і перехешовуються при наступному вході користувача
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
 
 
 def hash_password(password: str) -> str:
@@ -20,6 +33,44 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# bcrypt відпускає GIL, тому хешування виконується в окремому пулі потоків
+# і не блокує event loop
+hashing_executor = ThreadPoolExecutor(
+    max_workers=HASHING_MAX_WORKERS, thread_name_prefix="password-hashing"
+)
+_hashing_in_flight = 0
+
+
+async def _run_hashing(func, *args):
+    global _hashing_in_flight
+    if _hashing_in_flight >= HASHING_MAX_WORKERS + HASHING_MAX_QUEUE:
+        # Черга заповнена: швидко відмовляємо замість того, щоб накопичувати запити
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, try again later",
+            headers={"Retry-After": "1"},
+        )
+    _hashing_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(hashing_executor, func, *args)
+    finally:
+        _hashing_in_flight -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(pwd_context.hash, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    # Повертає новий хеш, якщо збережений застарів (needs_update)
+    return await _run_hashing(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
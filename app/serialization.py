@@ -0,0 +1,126 @@
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from pydantic_core import from_json, to_json
+
+from enums import TaskPriority, TaskStatus, UserRole
+from schemas import TaskChanges, TaskPage, TaskResponse, UserResponse
+
+# Адаптери компілюються один раз при імпорті, а не на кожен запит
+task_adapter = TypeAdapter(TaskResponse)
+task_list_adapter = TypeAdapter(List[TaskResponse])
+task_page_adapter = TypeAdapter(TaskPage)
+task_changes_adapter = TypeAdapter(TaskChanges)
+user_adapter = TypeAdapter(UserResponse)
+
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+USER_FIELDS = tuple(UserResponse.model_fields)
+
+
+def user_from_orm(user) -> UserResponse:
+    return UserResponse.model_construct(
+        id=user.id, username=user.username, email=user.email, role=user.role
+    )
+
+
+def task_from_orm(task) -> TaskResponse:
+    """
+    Builds a TaskResponse from a loaded Task without validation: rows come
+    from our own database, where the columns and enums are already enforced
+    and emails were validated when the users were created.
+    """
+    return TaskResponse.model_construct(
+        id=task.id,
+        name=task.name,
+        description=task.description,
+        status=task.status,
+        priority=task.priority,
+        creator_id=task.creator_id,
+        version=task.version,
+        assignees=[user_from_orm(user) for user in task.assignees],
+    )
+
+
+def user_from_json(raw: bytes) -> UserResponse:
+    data = from_json(raw)
+    data["role"] = UserRole(data["role"])
+    return UserResponse.model_construct(**data)
+
+
+def task_from_json(raw: bytes) -> TaskResponse:
+    # Зворотне до task_adapter.dump_json для даних із кешу, теж без валідації
+    data = from_json(raw)
+    data["status"] = TaskStatus(data["status"])
+    data["priority"] = TaskPriority(data["priority"])
+    data["assignees"] = [
+        UserResponse.model_construct(**{**user, "role": UserRole(user["role"])})
+        for user in data["assignees"]
+    ]
+    return TaskResponse.model_construct(**data)
+
+
+class JSONBytesResponse(Response):
+    """
+    Response for content that is already JSON bytes. Returning a Response
+    makes FastAPI skip validating and encoding the result against
+    response_model a second time.
+    """
+
+    media_type = "application/json"
+
+
+def task_response(task: TaskResponse) -> JSONBytesResponse:
+    return JSONBytesResponse(task_adapter.dump_json(task))
+
+
+def task_page_response(page: TaskPage) -> JSONBytesResponse:
+    return JSONBytesResponse(task_page_adapter.dump_json(page))
+
+
+def task_list_response(tasks: List[TaskResponse]) -> JSONBytesResponse:
+    return JSONBytesResponse(task_list_adapter.dump_json(tasks))
+
+
+def task_changes_response(changes: TaskChanges) -> JSONBytesResponse:
+    return JSONBytesResponse(task_changes_adapter.dump_json(changes))
+
+
+def parse_task_fields(
+    fields: Optional[str], expand: Optional[str]
+) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Turns the `fields` and `expand` query parameters into the task columns to
+    select and how to load assignees: None (not at all), "ids" or "expand"
+    (full user objects). Without `fields` every column is returned, with
+    expanded assignees as before.
+    """
+    if not fields:
+        return None, "expand"
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in TASK_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    columns = [name for name in dict.fromkeys(requested) if name != "assignees"]
+    if expand == "assignees":
+        return columns, "expand"
+    return columns, "ids" if "assignees" in requested else None
+
+
+def task_assignees(task: TaskResponse) -> List[dict]:
+    # Вбудовані виконавці як словники полів UserResponse - для ETag (etag.assignees_stamp)
+    return [{name: getattr(user, name) for name in USER_FIELDS} for user in task.assignees]
+
+
+def expanded_assignees(row: dict, assignees: Optional[str]) -> Optional[List[dict]]:
+    # Часткова відповідь вбудовує користувачів лише з expand=assignees; id покриває версія задачі
+    return row["assignees"] if assignees == "expand" else None
+
+
+def sparse_response(content) -> JSONBytesResponse:
+    # Частковий набір полів не відповідає TaskResponse, тому серіалізується напряму
+    return JSONBytesResponse(to_json(content))
@@ -0,0 +1,153 @@
+# app/smtp_pool.py
+import os
+import smtplib
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+from loguru import logger
+
+from .config import (
+    MAIL_USERNAME,
+    MAIL_PASSWORD,
+    MAIL_PORT,
+    MAIL_SERVER,
+    MAIL_TLS,
+    SMTP_POOL_SIZE,
+    SMTP_KEEPALIVE,
+    SMTP_MAX_MESSAGES_PER_CONNECTION,
+)
+
+# Помилки, після яких з'єднання вважається зламаним і відкривається нове.
+# Не OSError: від нього успадковується SMTPException, а відмова сервера
+# прийняти конкретний лист (SMTPRecipientsRefused, SMTPDataError) з'єднання не ламає
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+class PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.reset(server)
+
+    def reset(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def sendmail(self, from_addr: str, to_addr: str, message: str):
+        self.server.sendmail(from_addr, to_addr, message)
+        self.sent += 1
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+
+
+class SMTPConnectionPool:
+    """
+    Пул SMTP-з'єднань одного процесу воркера: з'єднання перевикористовуються
+    між задачами, перевіряються NOOP після простою і перевідкриваються після
+    max_messages листів або помилки.
+    """
+
+    def __init__(
+        self,
+        size: int = SMTP_POOL_SIZE,
+        keepalive: float = SMTP_KEEPALIVE,
+        max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+    ):
+        self.size = size
+        self.keepalive = keepalive
+        self.max_messages = max_messages
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(MAIL_SERVER, MAIL_PORT)
+        try:
+            if MAIL_TLS:
+                server.starttls()
+            if MAIL_USERNAME:
+                server.login(MAIL_USERNAME, MAIL_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _is_alive(self, connection: PooledConnection) -> bool:
+        if time.monotonic() - connection.last_used < self.keepalive:
+            return True
+        try:
+            return connection.server.noop()[0] == 250
+        except CONNECTION_ERRORS:
+            return False
+
+    def acquire(self) -> PooledConnection:
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return PooledConnection(self._connect())
+            if self._is_alive(connection):
+                return connection
+            connection.close()
+
+    def release(self, connection: PooledConnection, broken: bool = False):
+        if broken or connection.sent >= self.max_messages:
+            connection.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken)
+
+    def send(self, connection: PooledConnection, from_addr: str, to_addr: str, message: str):
+        if connection.sent >= self.max_messages:
+            # Ліміт листів на з'єднання: тихо перевідкриваємо його
+            connection.close()
+            connection.reset(self._connect())
+        try:
+            connection.sendmail(from_addr, to_addr, message)
+        except CONNECTION_ERRORS:
+            # Сервер закрив з'єднання: одна спроба через нове
+            logger.warning("SMTP connection lost, reconnecting")
+            connection.server.close()
+            connection.reset(self._connect())
+            connection.sendmail(from_addr, to_addr, message)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+_pool: Optional[SMTPConnectionPool] = None
+_pool_pid: Optional[int] = None
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    # Prefork-воркери Celery успадковують пам'ять батька, тому пул створюється
+    # окремо в кожному процесі
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = SMTPConnectionPool()
+        _pool_pid = os.getpid()
+    return _pool
@@ -0,0 +1,30 @@
+# app/sync_cleanup.py
+import asyncio
+import pathlib
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from .celery_app import celery_app
+from .config import SYNC_TOMBSTONE_RETENTION_DAYS
+from .outbox import get_relay_engine
+
+sys.path.append(str(pathlib.Path(__file__).resolve(strict=True).parent))
+
+from models import TaskTombstone  # noqa: E402
+
+
+async def purge_tombstones(retention_days: float = SYNC_TOMBSTONE_RETENTION_DAYS) -> int:
+    older_than = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    session = sessionmaker(get_relay_engine(), expire_on_commit=False, class_=AsyncSession)
+    async with session() as db:
+        purged = await TaskTombstone.purge(db, older_than)
+        await db.commit()
+    return purged
+
+
+@celery_app.task(name='purge_tombstones_task')
+def purge_tombstones_task():
+    return asyncio.run(purge_tombstones())
@@ -0,0 +1,54 @@
+"""
+Maintenance of the task_stats summary table behind GET /tasks/stats.
+
+    python app/task_stats_cli.py check      # compare with a fresh GROUP BY, exit 1 on drift
+    python app/task_stats_cli.py check --fix
+    python app/task_stats_cli.py rebuild    # recompute the whole table
+"""
+import argparse
+import asyncio
+import sys
+
+from db_utils.conn import async_session, engine
+from models import TaskStat
+
+
+async def rebuild() -> int:
+    async with async_session() as db:
+        rows = await TaskStat.rebuild(db)
+        await db.commit()
+    print(f"task_stats rebuilt: {rows} rows")
+    return 0
+
+
+async def check(fix: bool) -> int:
+    async with async_session() as db:
+        if engine.dialect.name == "postgresql":
+            # Обидва запити перевірки бачать один знімок бази, тож паралельні записи не дають хибних розбіжностей
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        mismatches = await TaskStat.check(db)
+    for key, stored, actual in mismatches:
+        print(f"{'/'.join(str(part) for part in key)}: stored={stored} actual={actual}")
+    if not mismatches:
+        print("task_stats is consistent")
+        return 0
+    print(f"{len(mismatches)} mismatching rows")
+    if fix:
+        await rebuild()
+    return 1
+
+
+async def main(args) -> int:
+    try:
+        if args.command == "rebuild":
+            return await rebuild()
+        return await check(args.fix)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--fix", action="store_true", help="rebuild the table when check finds drift")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,117 @@
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+# Модуль імпортується і вебзастосунком (як `tracing`), і воркером (як `app.tracing`),
+# тому налаштування передаються параметрами, а OpenTelemetry імпортується ліниво:
+# з вимкненим трасуванням він не завантажується взагалі
+
+
+def configure_tracing(
+    service_name: str,
+    sample_ratio: float,
+    exporter: str = "file",
+    path: str = "traces.jsonl",
+    endpoint: Optional[str] = None,
+):
+    """
+    Installs the global tracer provider. Root spans are sampled with
+    `sample_ratio`, child spans (including Celery tasks) follow their parent.
+    `exporter` is "file" (one JSON span per line appended to `path`) or
+    "otlp" (OTLP over HTTP to `endpoint`).
+    """
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        span_exporter = OTLPSpanExporter(endpoint=endpoint)
+    elif exporter == "file":
+        span_exporter = ConsoleSpanExporter(
+            out=open(path, "a", buffering=1),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    else:
+        raise ValueError(f"Unknown trace exporter: {exporter}")
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio)),
+    )
+    # Спани експортуються пакетами з фонового потоку, а не під час запиту
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def instrument_app(app, *engines):
+    """Spans for every route of the FastAPI `app` and every statement on `engines`."""
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics")
+    instrument_engine(*engines)
+
+
+def instrument_worker():
+    """Publish and execution spans for Celery tasks; context travels in task headers."""
+    from opentelemetry.instrumentation.celery import CeleryInstrumentor
+
+    CeleryInstrumentor().instrument()
+
+
+def instrument_engine(*engines):
+    # Інструментатор SQLAlchemy можна застосувати лише один раз на процес,
+    # тому primary і репліки передаються разом
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    SQLAlchemyInstrumentor().instrument(engines=[engine.sync_engine for engine in engines])
+
+
+def start_span(name: str):
+    from opentelemetry import trace
+
+    return trace.get_tracer(__name__).start_as_current_span(name)
+
+
+def shutdown_tracing():
+    from opentelemetry import trace
+
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+
+def inject_context() -> dict:
+    """
+    Trace context of the current span as W3C headers, for work that is stored
+    now and picked up later (e.g. outbox rows). Empty when nothing is sampled.
+    """
+    from opentelemetry import propagate, trace
+
+    if not trace.get_current_span().is_recording():
+        return {}
+    carrier: dict = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+@contextmanager
+def linked_span(name: str, carriers: Iterable[Optional[dict]]):
+    """
+    Starts a span linked to every trace in `carriers`: a batch handles work
+    from many requests, so it cannot be the child of any single one.
+    """
+    from opentelemetry import propagate, trace
+
+    links = []
+    for carrier in carriers:
+        if carrier:
+            span_context = trace.get_current_span(propagate.extract(carrier)).get_span_context()
+            if span_context.is_valid:
+                links.append(trace.Link(span_context))
+
+    with trace.get_tracer(__name__).start_as_current_span(name, links=links) as span:
+        yield span
@@ -0,0 +1,275 @@
+"""
+In-process benchmark of the API routers.
+
+Drives the FastAPI `app` from app/main.py through httpx's ASGI transport, so no
+server, broker or SMTP is involved. The database is whatever DATABASE_URL
+points at; by default a throwaway SQLite file (via aiosqlite) is used as a
+local stand-in for Postgres.
+
+For every endpoint it reports throughput, p50/p95/p99 latency, SQL statements
+per request and memory allocated per request, and writes everything to a JSON
+file. Pass --baseline with an earlier results file to print the change, and
+--check-sql to fail when an endpoint issues more statements than SQL_BUDGETS
+allows (the occasional token-version cache miss is covered by the slack).
+
+    python benchmarks/bench_api.py --users 200 --tasks 5000 --requests 500
+    python benchmarks/bench_api.py --output new.json --baseline old.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{pathlib.Path(tempfile.gettempdir()) / 'pyjira_bench.db'}",
+)
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["USE_MAILING"] = "False"
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "app"))
+
+import httpx  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from db_utils.conn import async_session, engine  # noqa: E402
+from enums import TaskPriority, TaskStatus, UserRole  # noqa: E402
+from main import app  # noqa: E402
+from models import Base, Task, User, task_user_table  # noqa: E402
+from security import pwd_context  # noqa: E402
+
+PASSWORD = "bench-password"
+
+# Максимальна середня кількість SQL-запитів на запит для --check-sql
+SQL_BUDGETS = {
+    "GET /tasks": 2.5,
+    "GET /tasks/{task_id}": 2.5,
+    # +2 перед COMMIT: резервування номерів змін і запис change_seq (GET /tasks/changes);
+    # +1, якщо змінився статус або пріоритет: upsert лічильників task_stats
+    "PUT /tasks/{task_id}": 6.5,
+    "GET /users/{user_id}": 1.5,
+    "POST /token": 2.0,
+}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def seed(users: int, tasks: int, assignees_per_task: int, rng: random.Random):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Один хеш на всіх користувачів: bcrypt на кожного зайняв би хвилини
+    password_hash = pwd_context.hash(PASSWORD)
+    roles = [UserRole.ADMIN, UserRole.MANAGER] + [UserRole.USER] * (users - 2)
+    async with async_session() as db:
+        await db.execute(
+            insert(User),
+            [
+                {
+                    "id": user_id,
+                    "username": f"user{user_id}",
+                    "password": password_hash,
+                    "email": f"user{user_id}@example.com",
+                    "role": roles[user_id - 1],
+                }
+                for user_id in range(1, users + 1)
+            ],
+        )
+        await db.execute(
+            insert(Task),
+            [
+                {
+                    "id": task_id,
+                    "name": f"Task {task_id}",
+                    "description": f"Benchmark task {task_id}",
+                    "status": rng.choice(list(TaskStatus)),
+                    "priority": rng.choice(list(TaskPriority)),
+                    "creator_id": rng.randint(1, users),
+                }
+                for task_id in range(1, tasks + 1)
+            ],
+        )
+        links = [
+            {"task_id": task_id, "user_id": user_id}
+            for task_id in range(1, tasks + 1)
+            for user_id in rng.sample(range(1, users + 1), min(assignees_per_task, users))
+        ]
+        if links:
+            await db.execute(insert(task_user_table), links)
+        await db.commit()
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+async def run_endpoint(client, make_request, requests: int, concurrency: int):
+    counter = StatementCounter()
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.request.url}: {response.status_code} {response.text}")
+
+    await make_request(client, 0)  # прогрів
+
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+    # Пам'ять міряється окремим коротким проходом: tracemalloc спотворює час
+    memory_requests = min(requests, 50)
+    tracemalloc.start()
+    for i in range(memory_requests):
+        await make_request(client, i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "sql_statements_per_request": round(counter.count / requests, 2),
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def endpoints(args, headers):
+    manager = headers["manager"]
+
+    async def list_tasks(client, i):
+        return await client.get("/tasks", headers=manager)
+
+    async def get_task(client, i):
+        return await client.get(f"/tasks/{i % args.tasks + 1}", headers=manager)
+
+    async def update_task(client, i):
+        status = list(TaskStatus)[i % len(TaskStatus)].value
+        return await client.put(f"/tasks/{i % args.tasks + 1}", json={"status": status}, headers=manager)
+
+    async def get_user(client, i):
+        return await client.get(f"/users/{i % args.users + 1}", headers=manager)
+
+    async def login(client, i):
+        return await client.post("/token", data={"username": "user3", "password": PASSWORD})
+
+    return {
+        "GET /tasks": (list_tasks, args.requests),
+        "GET /tasks/{task_id}": (get_task, args.requests),
+        "PUT /tasks/{task_id}": (update_task, args.requests),
+        "GET /users/{user_id}": (get_user, args.requests),
+        # bcrypt навмисно повільний, тому логінів менше
+        "POST /token": (login, max(1, args.requests // 10)),
+    }
+
+
+def print_comparison(results, baseline_path):
+    baseline = json.loads(pathlib.Path(baseline_path).read_text())["results"]
+    print(f"\nchange vs {baseline_path}:")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        deltas = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "sql_statements_per_request"):
+            if previous[key]:
+                deltas.append(f"{key} {100 * (current[key] - previous[key]) / previous[key]:+.1f}%")
+        print(f"  {name:<24} " + ", ".join(deltas))
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    await seed(args.users, args.tasks, args.assignees_per_task, rng)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/token", data={"username": "user2", "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"manager": {"Authorization": f"Bearer {response.json()['access_token']}"}}
+
+        results = {}
+        for name, (make_request, requests) in endpoints(args, headers).items():
+            results[name] = await run_endpoint(client, make_request, requests, args.concurrency)
+            r = results[name]
+            print(
+                f"{name:<24} {r['throughput_rps']:8.1f} req/s  p50={r['p50_ms']:7.2f}ms "
+                f"p95={r['p95_ms']:7.2f}ms p99={r['p99_ms']:7.2f}ms  "
+                f"sql/req={r['sql_statements_per_request']:5.2f}  peak={r['peak_memory_kib']:8.1f}KiB"
+            )
+
+    await engine.dispose()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "dataset": {
+                "users": args.users,
+                "tasks": args.tasks,
+                "assignees_per_task": args.assignees_per_task,
+            },
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    pathlib.Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\nresults written to {args.output}")
+
+    if args.baseline:
+        print_comparison(results, args.baseline)
+
+    if args.check_sql:
+        over_budget = {
+            name: r["sql_statements_per_request"]
+            for name, r in results.items()
+            if r["sql_statements_per_request"] > SQL_BUDGETS.get(name, float("inf"))
+        }
+        for name, statements in over_budget.items():
+            print(f"SQL budget exceeded: {name} {statements} > {SQL_BUDGETS[name]}")
+        return 1 if over_budget else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--assignees-per-task", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--check-sql", action="store_true")
+    args = parser.parse_args()
+    if args.users < 3:
+        parser.error("--users must be at least 3 (admin, manager and a regular user)")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,76 @@
+"""
+Per-request cost of get_current_user: token-only principal vs. the old
+decode + User.get_user_by_username lookup.
+
+Usage (from the repository root):
+    DATABASE_URL=sqlite+aiosqlite:///bench.db SECRET_KEY=bench python benchmarks/bench_auth.py
+"""
+import argparse
+import asyncio
+import os
+import pathlib
+import statistics
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///bench_auth.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "app"))
+
+from db_utils.conn import async_session, engine  # noqa: E402
+from dependencies import get_current_user  # noqa: E402
+from models import Base, User, token_version_cache  # noqa: E402
+from security import create_access_token, decode_access_token  # noqa: E402
+
+
+async def legacy_get_current_user(db, token):
+    payload = decode_access_token(token)
+    return await User.get_user_by_username(db, payload["sub"])
+
+
+async def measure(name, func, db, token, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func(db, token)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    print(
+        f"{name:<28} p50={statistics.median(samples):8.1f}us "
+        f"p99={samples[int(len(samples) * 0.99) - 1]:8.1f}us"
+    )
+
+
+async def main(iterations):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as db:
+        user = await User.get_user_by_username(db, "bench_user")
+        if user is None:
+            db.add(
+                User(username="bench_user", password="x", email="bench@example.com")
+            )
+            await db.commit()
+            user = await User.get_user_by_username(db, "bench_user")
+
+        token = create_access_token(
+            {"sub": user.username, "uid": user.id, "role": user.role.value, "ver": 0}
+        )
+
+        await measure("db lookup (legacy)", legacy_get_current_user, db, token, iterations)
+        await measure("signed claims, warm cache", get_current_user, db, token, iterations)
+
+        async def cold(db, token):
+            token_version_cache.clear()
+            return await get_current_user(db, token)
+
+        await measure("signed claims, cold cache", cold, db, token, iterations)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--iterations", type=int, default=5000)
+    asyncio.run(main(parser.parse_args().iterations))
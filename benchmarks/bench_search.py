@@ -0,0 +1,110 @@
+"""
+Query latency of GET /tasks/search (Task.search) on a seeded database.
+
+Seed the database in DATABASE_URL first; seeded task texts use a Zipf
+vocabulary, so the queries below cover common, medium and rare words, a
+short prefix and a two-word query:
+
+    python benchmarks/seed.py --users 10000 --tasks 1000000
+    python benchmarks/bench_search.py --repeat 50
+
+Every query is timed for an admin (all tasks) and for the most active
+creator (the USER scoping of get_tasks). On Postgres the tsvector column
+and GIN index are used and --explain prints the plan of the common-word
+query; elsewhere the in-memory inverted index is used and the time to build
+it on the first search is reported separately.
+"""
+import argparse
+import asyncio
+import os
+import pathlib
+import statistics
+import sys
+import time
+from collections import Counter
+
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "app"))
+
+from sqlalchemy import func, select, text  # noqa: E402
+
+from db_utils.conn import engine, read_session  # noqa: E402
+from models import Task  # noqa: E402
+from search import postgres_search_query, tokenize  # noqa: E402
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def pick_queries(db, sample_size: int) -> dict:
+    # Частоти слів оцінюються за випадковою вибіркою задач
+    max_id = await db.scalar(select(func.max(Task.id)))
+    if not max_id:
+        raise SystemExit("no tasks, run benchmarks/seed.py first")
+    step = max(1, max_id // sample_size)
+    rows = await db.execute(select(Task.name, Task.description).where(Task.id % step == 0).limit(sample_size))
+    counts = Counter(term for row in rows for term in tokenize(f"{row.name} {row.description}"))
+    ranked = [term for term, _ in counts.most_common()]
+    common, medium, rare = ranked[0], ranked[len(ranked) // 10], ranked[-1]
+    return {
+        "common": common,
+        "medium": medium,
+        "rare": rare,
+        "prefix": common[:3],
+        "two words": f"{common} {medium}",
+    }
+
+
+async def time_query(q: str, limit: int, creator_id, repeat: int):
+    samples, found = [], 0
+    for _ in range(repeat):
+        async with read_session() as db:
+            started = time.perf_counter()
+            found = len(await Task.search(db, q, limit, creator_id))
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples, found
+
+
+async def main(args):
+    async with read_session() as db:
+        queries = await pick_queries(db, args.sample)
+        total = await db.scalar(select(func.count()).select_from(Task))
+        top_creator = await db.scalar(
+            select(Task.creator_id).group_by(Task.creator_id).order_by(func.count().desc()).limit(1)
+        )
+    is_postgres = engine.dialect.name == "postgresql"
+    print(f"{total} tasks, backend: {'tsvector + GIN' if is_postgres else 'in-memory inverted index'}")
+
+    if not is_postgres:
+        started = time.perf_counter()
+        async with read_session() as db:
+            await Task.search(db, queries["rare"], 1)
+        print(f"index build (first search): {time.perf_counter() - started:.1f}s")
+
+    for scope, creator_id in (("admin", None), (f"creator {top_creator}", top_creator)):
+        for name, q in queries.items():
+            samples, found = await time_query(q, args.limit, creator_id, args.repeat)
+            print(
+                f"{scope:<14} {name:<10} {q!r:<28} found={found:<4} "
+                f"p50={statistics.median(samples):8.2f}ms p95={percentile(samples, 0.95):8.2f}ms "
+                f"p99={percentile(samples, 0.99):8.2f}ms"
+            )
+
+    if args.explain and is_postgres:
+        query = postgres_search_query(Task, tokenize(queries["common"])).limit(args.limit)
+        compiled = query.compile(engine.sync_engine, compile_kwargs={"literal_binds": True})
+        async with engine.connect() as conn:
+            plan = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+            print("\n".join(row[0] for row in plan))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--sample", type=int, default=5000, help="tasks sampled to pick query words")
+    parser.add_argument("--explain", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+"""
+Microbenchmark of task list serialization.
+
+Builds N transient Task objects with assignees (no database involved) and
+times the ways a page of tasks can become JSON bytes:
+
+  fastapi    TaskResponse.model_validate per task, then what FastAPI does with
+             response_model=TaskPage: validate the page again, convert it to
+             jsonable data and encode it with json.dumps (the old path)
+  validated  one precompiled TypeAdapter validation of the ORM objects, then
+             TypeAdapter.dump_json
+  trusted    task_from_orm (no validation) and TypeAdapter.dump_json (the path
+             the task routes use now)
+
+    python benchmarks/bench_serialization.py --tasks 10000 --assignees 3
+"""
+import argparse
+import asyncio
+import os
+import pathlib
+import sys
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "app"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from enums import TaskPriority, TaskStatus, UserRole  # noqa: E402
+from models import Task, User  # noqa: E402
+from schemas import TaskPage, TaskResponse  # noqa: E402
+from serialization import task_from_orm, task_list_adapter, task_page_adapter  # noqa: E402
+
+
+def make_tasks(count: int, assignees: int):
+    users = [
+        User(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com", role=UserRole.USER)
+        for user_id in range(1, 101)
+    ]
+    statuses, priorities = list(TaskStatus), list(TaskPriority)
+    return [
+        Task(
+            id=task_id,
+            name=f"Task {task_id}",
+            description=f"Benchmark task {task_id}",
+            status=statuses[task_id % len(statuses)],
+            priority=priorities[task_id % len(priorities)],
+            creator_id=task_id % 100 + 1,
+            # Транзієнтні об'єкти не проходять через INSERT, тож default версії не застосовується
+            version=1,
+            assignees=[users[(task_id + offset) % 100] for offset in range(assignees)],
+        )
+        for task_id in range(1, count + 1)
+    ]
+
+
+async def fastapi_path(tasks, field):
+    items = [TaskResponse.model_validate(task) for task in tasks]
+    content = await serialize_response(field=field, response_content=TaskPage(items=items))
+    return JSONResponse(content).body
+
+
+async def validated_path(tasks, field):
+    items = task_list_adapter.validate_python(tasks, from_attributes=True)
+    return task_page_adapter.dump_json(TaskPage.model_construct(items=items, next_cursor=None))
+
+
+async def trusted_path(tasks, field):
+    items = [task_from_orm(task) for task in tasks]
+    return task_page_adapter.dump_json(TaskPage.model_construct(items=items, next_cursor=None))
+
+
+async def measure(path, tasks, field, repeat: int):
+    body = await path(tasks, field)  # прогрів
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await path(tasks, field)
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(body)
+
+
+async def main(args):
+    tasks = make_tasks(args.tasks, args.assignees)
+    field = create_response_field(name="response", type_=TaskPage, mode="serialization")
+
+    paths = {"fastapi": fastapi_path, "validated": validated_path, "trusted": trusted_path}
+    bodies = {name: await path(tasks, field) for name, path in paths.items()}
+    if len(set(bodies.values())) != 1:
+        raise SystemExit("serialization paths produce different JSON")
+
+    results = {name: await measure(path, tasks, field, args.repeat) for name, path in paths.items()}
+
+    baseline = results["fastapi"][0]
+    for name, (best, size) in results.items():
+        print(
+            f"{name:<10} {best * 1000:9.1f}ms  {args.tasks / best:10.0f} tasks/s  "
+            f"{size / 1024:8.0f}KiB  x{baseline / best:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--assignees", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
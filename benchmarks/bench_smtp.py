@@ -0,0 +1,78 @@
+"""
+SMTP throughput against the local sink (benchmarks/smtp_sink.py).
+
+Compares a new connection per email (the behaviour before the pool),
+the pooled connection used one email at a time, and batch delivery of all
+emails over one connection.
+
+    python benchmarks/bench_smtp.py -n 2000
+"""
+import argparse
+import os
+import pathlib
+import smtplib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+PORT = int(os.environ.get("BENCH_SMTP_PORT", "8027"))
+
+os.environ.update(
+    MAIL_SERVER="127.0.0.1",
+    MAIL_PORT=str(PORT),
+    MAIL_TLS="False",
+    MAIL_USERNAME="",
+    MAIL_FROM="bench@example.com",
+)
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from app.email_utils import build_message, deliver_emails  # noqa: E402
+from app.smtp_pool import get_smtp_pool  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+
+def connection_per_email(messages):
+    for message in messages:
+        with smtplib.SMTP("127.0.0.1", PORT) as server:
+            msg = build_message(message["email_to"], message["subject"], message["body"])
+            server.sendmail("bench@example.com", message["email_to"], msg.as_string())
+
+
+def pooled_one_by_one(messages):
+    for message in messages:
+        deliver_emails([message])
+
+
+def pooled_batch(messages):
+    deliver_emails(messages)
+
+
+def main(count):
+    messages = [
+        {
+            "email_to": f"user{i}@example.com",
+            "subject": f"Task {i} status changed",
+            "body": f"Task {i} has changed status to done",
+        }
+        for i in range(count)
+    ]
+    with SMTPSink(port=PORT) as sink:
+        for name, func in [
+            ("connection per email", connection_per_email),
+            ("pooled, one at a time", pooled_one_by_one),
+            ("pooled, batch", pooled_batch),
+        ]:
+            received = sink.handler.received
+            start = time.perf_counter()
+            func(messages)
+            elapsed = time.perf_counter() - start
+            delivered = sink.handler.received - received
+            print(f"{name:<24} {delivered / elapsed:9.0f} msg/s ({delivered} delivered)")
+            get_smtp_pool().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=1000)
+    main(parser.parse_args().count)
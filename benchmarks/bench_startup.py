@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark: import time of the web app and time to first request.
+
+`python -X importtime -c "import main"` is run in a fresh interpreter and the
+slowest modules are listed. A second fresh interpreter imports the app and
+serves GET /openapi.json through an in-process ASGI transport; the wall time
+from interpreter start to the response is reported as time to first request.
+
+Exits with status 1 when a result is over its budget, so it can run in CI:
+    python benchmarks/bench_startup.py --import-budget-ms 1000 --first-request-budget-ms 1500
+"""
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+import time
+
+APP_DIR = pathlib.Path(__file__).resolve().parent.parent / "app"
+
+FIRST_REQUEST_SCRIPT = """
+import asyncio, httpx
+from main import app
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/openapi.json")
+        response.raise_for_status()
+
+asyncio.run(first_request())
+"""
+
+
+def run_python(*args):
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite+aiosqlite:///bench_startup.db")
+    env.setdefault("SECRET_KEY", "bench")
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *args],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed, (time.perf_counter() - start) * 1000
+
+
+def import_profile():
+    completed, _ = run_python("-X", "importtime", "-c", "import main")
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = (
+            part.strip() for part in line[len("import time:"):].split("|")
+        )
+        modules.append((int(cumulative_us), int(self_us), name))
+    total_us = next(cum for cum, _, name in modules if name == "main")
+    return total_us / 1000, sorted(modules, key=lambda m: m[1], reverse=True)
+
+
+def main(args):
+    import_ms, modules = import_profile()
+    _, first_request_ms = run_python("-c", FIRST_REQUEST_SCRIPT)
+
+    print(f"import main:         {import_ms:8.1f} ms (budget {args.import_budget_ms} ms)")
+    print(
+        f"time to 1st request: {first_request_ms:8.1f} ms "
+        f"(budget {args.first_request_budget_ms} ms)"
+    )
+    print("\nslowest modules (self time):")
+    for cumulative_us, self_us, name in modules[: args.top]:
+        print(f"  {self_us / 1000:7.1f} ms  {name}")
+
+    over_budget = (
+        import_ms > args.import_budget_ms
+        or first_request_ms > args.first_request_budget_ms
+    )
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--import-budget-ms", type=float, default=1000)
+    parser.add_argument("--first-request-budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""
+Load test: /tasks latency while /token is flooded with logins.
+
+Runs against a live server. Measures /tasks latency alone, then again while
+`--concurrency` clients hammer /token, and prints both distributions together
+with how many logins were rejected by the hashing backpressure (503).
+
+Usage:
+    python benchmarks/load_login.py --base-url http://localhost:8000 \\
+        --username admin --password admin --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def summary(samples):
+    if not samples:
+        return "no samples"
+    samples = sorted(samples)
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    return (
+        f"n={len(samples)} p50={statistics.median(samples):.1f}ms "
+        f"p95={pct(0.95):.1f}ms p99={pct(0.99):.1f}ms max={samples[-1]:.1f}ms"
+    )
+
+
+async def probe_tasks(client, headers, stop_at):
+    samples = []
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        response = await client.get("/tasks", headers=headers)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+    return samples
+
+
+async def flood_login(client, credentials, stop_at, statuses):
+    while time.monotonic() < stop_at:
+        response = await client.post("/token", data=credentials)
+        statuses[response.status_code] += 1
+
+
+async def main(args):
+    credentials = {"username": args.username, "password": args.password}
+    limits = httpx.Limits(max_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60
+    ) as client:
+        response = await client.post("/token", data=credentials)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        baseline = await probe_tasks(
+            client, headers, time.monotonic() + args.duration
+        )
+        print(f"/tasks idle:          {summary(baseline)}")
+
+        statuses = Counter()
+        stop_at = time.monotonic() + args.duration
+        results = await asyncio.gather(
+            probe_tasks(client, headers, stop_at),
+            *(
+                flood_login(client, credentials, stop_at, statuses)
+                for _ in range(args.concurrency)
+            ),
+        )
+        print(f"/tasks under /token:  {summary(results[0])}")
+        print(f"/token responses:     {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
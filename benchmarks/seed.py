@@ -0,0 +1,230 @@
+"""
+Synthetic data seeder for load testing.
+
+Generates users, tasks and task_user links with a configurable distribution
+and streams them into DATABASE_URL: batches are generated in a worker thread
+while the previous batch is being loaded, with COPY on Postgres (asyncpg) and
+multi-row INSERTs elsewhere. All users share one precomputed password hash.
+
+    python benchmarks/seed.py --users 10000 --tasks 1000000 \\
+        --creator-skew 1.2 --max-assignees 4 \\
+        --status-mix todo=0.5,in_progress=0.3,done=0.2
+
+Task names and descriptions are made of pseudo-words with Zipf-distributed
+frequencies (--vocabulary words), so full-text search sees a realistic mix
+of common and rare terms.
+
+Seeded users are called seed_user_<n> with the password given by --password.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import pathlib
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "app"))
+os.environ.setdefault("SECRET_KEY", "seed")
+
+from sqlalchemy import func, insert, select, text, update  # noqa: E402
+
+from db_utils.conn import async_session, engine  # noqa: E402
+from enums import TaskPriority, TaskStatus, UserRole  # noqa: E402
+from models import Base, SyncState, Task, TaskStat, User, task_user_table  # noqa: E402
+from security import pwd_context  # noqa: E402
+
+TASK_COLUMNS = ["id", "name", "description", "status", "priority", "creator_id", "change_seq"]
+USER_COLUMNS = ["id", "username", "password", "email", "role"]
+LINK_COLUMNS = ["task_id", "user_id"]
+
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "to", "vu", "sa", "de", "pli", "gor", "an", "es", "tri", "bo", "nu", "fe"]
+NAME_WORDS = 4
+DESCRIPTION_WORDS = 16
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    words = {}
+    while len(words) < size:
+        words["".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))] = None
+    return list(words)
+
+
+def parse_mix(value: str, enum) -> Dict:
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        mix[enum[name.strip().upper()]] = float(weight)
+    return mix
+
+
+class Generator:
+    def __init__(self, args, first_user_id: int, first_task_id: int, first_seq: int):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.first_user_id = first_user_id
+        self.first_task_id = first_task_id
+        # Кожна задача отримує власний номер у послідовності змін (GET /tasks/changes)
+        self.first_seq = first_seq
+        self.user_ids = range(first_user_id, first_user_id + args.users)
+        # Zipf-подібний розподіл авторів: кілька користувачів створюють більшість задач
+        self.creator_weights = list(
+            itertools.accumulate(1 / (rank ** args.creator_skew) for rank in range(1, args.users + 1))
+        )
+        self.assignee_counts = list(range(args.max_assignees + 1))
+        self.assignee_weights = [1 / (count + 1) for count in self.assignee_counts]
+        self.status_mix = parse_mix(args.status_mix, TaskStatus)
+        self.priority_mix = parse_mix(args.priority_mix, TaskPriority)
+        self.words = make_vocabulary(args.vocabulary, self.rng)
+        self.word_weights = list(
+            itertools.accumulate(1 / rank for rank in range(1, len(self.words) + 1))
+        )
+
+    def users(self, password_hash: str) -> List[Tuple]:
+        roles = [UserRole.ADMIN, UserRole.MANAGER] + [UserRole.USER] * (self.args.users - 2)
+        return [
+            (user_id, f"seed_user_{user_id}", password_hash, f"seed_user_{user_id}@example.com", role)
+            for user_id, role in zip(self.user_ids, roles)
+        ]
+
+    def task_batch(self, start: int, size: int) -> Tuple[List[Tuple], List[Tuple]]:
+        rng = self.rng
+        creators = rng.choices(self.user_ids, cum_weights=self.creator_weights, k=size)
+        statuses = rng.choices(list(self.status_mix), weights=list(self.status_mix.values()), k=size)
+        priorities = rng.choices(list(self.priority_mix), weights=list(self.priority_mix.values()), k=size)
+        counts = rng.choices(self.assignee_counts, weights=self.assignee_weights, k=size)
+        words = rng.choices(
+            self.words, cum_weights=self.word_weights, k=size * (NAME_WORDS + DESCRIPTION_WORDS)
+        )
+
+        tasks, links = [], []
+        for offset in range(size):
+            task_id = start + offset
+            first_word = offset * (NAME_WORDS + DESCRIPTION_WORDS)
+            name = " ".join(words[first_word:first_word + NAME_WORDS])
+            description = " ".join(
+                words[first_word + NAME_WORDS:first_word + NAME_WORDS + DESCRIPTION_WORDS]
+            )
+            tasks.append(
+                (task_id, name, description,
+                 statuses[offset], priorities[offset], creators[offset],
+                 self.first_seq + task_id - self.first_task_id)
+            )
+            for user_id in rng.sample(self.user_ids, counts[offset]):
+                links.append((task_id, user_id))
+        return tasks, links
+
+    def batches(self) -> Iterator[Tuple[int, int]]:
+        end = self.first_task_id + self.args.tasks
+        for start in range(self.first_task_id, end, self.args.batch_size):
+            yield start, min(self.args.batch_size, end - start)
+
+
+class Loader:
+    def __init__(self, conn):
+        self.conn = conn
+        self.is_postgres = conn.dialect.name == "postgresql"
+
+    async def load(self, table, columns: List[str], rows: List[Tuple]):
+        if not rows:
+            return
+        if self.is_postgres:
+            raw = await self.conn.get_raw_connection()
+            # Enum-типи в базі зберігають імена членів (TODO, IN_PROGRESS ...)
+            records = [
+                tuple(value.name if hasattr(value, "name") else value for value in row)
+                for row in rows
+            ]
+            await raw.driver_connection.copy_records_to_table(
+                table.name, records=records, columns=columns
+            )
+        else:
+            await self.conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+    async def reset_sequences(self):
+        if self.is_postgres:
+            for table in ("users", "tasks"):
+                await self.conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                    )
+                )
+
+
+async def main(args):
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        first_user_id = (await conn.scalar(select(func.max(User.id))) or 0) + 1
+        first_task_id = (await conn.scalar(select(func.max(Task.id))) or 0) + 1
+        first_seq = await conn.scalar(select(SyncState.last_seq)) + 1
+
+    generator = Generator(args, first_user_id, first_task_id, first_seq)
+    password_hash = pwd_context.hash(args.password)
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.prefetch)
+
+    async def produce():
+        # Генерація в окремому потоці, щоб наступний пакет готувався під час завантаження
+        for start, size in generator.batches():
+            batch = await loop.run_in_executor(None, generator.task_batch, start, size)
+            await queue.put(batch)
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    loaded_tasks = loaded_links = 0
+    async with engine.begin() as conn:
+        loader = Loader(conn)
+        await loader.load(User.__table__, USER_COLUMNS, generator.users(password_hash))
+        while (batch := await queue.get()) is not None:
+            tasks, links = batch
+            await loader.load(Task.__table__, TASK_COLUMNS, tasks)
+            await loader.load(task_user_table, LINK_COLUMNS, links)
+            loaded_tasks += len(tasks)
+            loaded_links += len(links)
+            if args.verbose:
+                elapsed = time.perf_counter() - started
+                print(f"{loaded_tasks:>10} tasks {loaded_links:>10} links {loaded_tasks / elapsed:10.0f} tasks/s")
+        await loader.reset_sequences()
+        await conn.execute(
+            update(SyncState).values(last_seq=first_seq + loaded_tasks - 1)
+        )
+    await producer
+
+    # Завантажувач пише в обхід моделей, тому лічильники GET /tasks/stats
+    # перераховуються одним GROUP BY по всіх задачах
+    async with async_session() as db:
+        stats_rows = await TaskStat.rebuild(db)
+        await db.commit()
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"seeded {args.users} users, {loaded_tasks} tasks and {loaded_links} links "
+        f"in {elapsed:.1f}s ({loaded_tasks / elapsed:.0f} tasks/s), {stats_rows} task_stats rows"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--max-assignees", type=int, default=3)
+    parser.add_argument("--creator-skew", type=float, default=1.1, help="Zipf exponent, 0 is uniform")
+    parser.add_argument("--status-mix", default="todo=0.5,in_progress=0.3,done=0.2")
+    parser.add_argument("--priority-mix", default="low=0.3,medium=0.5,high=0.2")
+    parser.add_argument("--vocabulary", type=int, default=20_000, help="distinct words in task texts")
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--prefetch", type=int, default=2, help="generated batches waiting to be loaded")
+    parser.add_argument("--password", default="seed-password")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.users < 2:
+        parser.error("--users must be at least 2")
+    asyncio.run(main(args))
@@ -0,0 +1,67 @@
+"""
+Local SMTP stand-in for development and tests (requires `aiosmtpd`).
+
+Accepts every message without TLS or AUTH and counts what it receives. Point
+the app at it with MAIL_SERVER=127.0.0.1, MAIL_PORT=<port>, MAIL_TLS=False and
+an empty MAIL_USERNAME.
+
+    python benchmarks/smtp_sink.py --port 8025 --verbose
+"""
+import argparse
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+
+
+class CountingHandler:
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.received = 0
+        self.messages = []
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.received += 1
+            if self.verbose:
+                self.messages.append(envelope)
+                print(f"{envelope.mail_from} -> {', '.join(envelope.rcpt_tos)}")
+        return "250 Message accepted for delivery"
+
+
+class SMTPSink:
+    """
+    Context manager running the sink in a background thread:
+
+        with SMTPSink(port=8025) as sink:
+            ...
+            assert sink.handler.received == 1
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8025, verbose: bool = False):
+        self.handler = CountingHandler(verbose)
+        self.controller = Controller(self.handler, hostname=host, port=port)
+
+    def __enter__(self):
+        self.controller.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    with SMTPSink(args.host, args.port, args.verbose) as sink:
+        print(f"SMTP sink listening on {args.host}:{args.port}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"received {sink.handler.received} messages")
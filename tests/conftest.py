@@ -0,0 +1,17 @@
+import os
+import pathlib
+import sys
+import tempfile
+
+# Окрема SQLite-база для тестів; змінні задаються до імпорту config
+os.environ["DATABASE_URL"] = (
+    f"sqlite+aiosqlite:///{pathlib.Path(tempfile.gettempdir()) / 'pyjira_tests.db'}"
+)
+os.environ.setdefault("SECRET_KEY", "tests")
+os.environ["USE_MAILING"] = "False"
+os.environ["CACHE_BACKEND"] = "none"
+os.environ["BCRYPT_ROUNDS"] = "4"
+# Версія токена не повинна застаріти посеред тесту: інакше з'являється зайвий запит
+os.environ["TOKEN_VERSION_CACHE_TTL"] = "600"
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "app"))
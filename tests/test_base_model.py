@@ -0,0 +1,68 @@
+"""
+Base.update(savepoint=True): the UPDATE runs inside the SAVEPOINT, so a
+failing update rolls back only itself and the outer transaction goes on.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, insert, select
+
+from db_utils.conn import async_session, engine
+from enums import UserRole
+from models import Base, User
+
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session() as db:
+        await db.execute(
+            insert(User),
+            [
+                {"id": 1, "username": "first", "password": "x",
+                 "email": "first@example.com", "role": UserRole.USER},
+                {"id": 2, "username": "second", "password": "x",
+                 "email": "second@example.com", "role": UserRole.USER},
+            ],
+        )
+        await db.commit()
+
+
+async def failed_update_in_savepoint():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    async with async_session(info={"unit_of_work": True}) as db:
+        first = await db.get(User, 1)
+        second = await db.get(User, 2)
+        await first.update(db, email="first@example.org")
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            with pytest.raises(HTTPException) as error:
+                # Дубль унікального username
+                await second.update(db, savepoint=True, username="first")
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        # Зовнішня транзакція придатна: попередня зміна комітиться
+        await db.commit()
+
+    async with async_session() as db:
+        users = {user.id: user for user in (await db.execute(select(User))).scalars()}
+    await engine.dispose()
+    return error.value.status_code, statements, users
+
+
+def test_failed_update_with_savepoint_keeps_outer_transaction():
+    asyncio.run(seed())
+    status_code, statements, users = asyncio.run(failed_update_in_savepoint())
+
+    assert status_code == 422
+    assert statements[:3] == ["SAVEPOINT", "UPDATE", "ROLLBACK"]
+    assert users[1].email == "first@example.org"
+    assert users[2].username == "second"
@@ -0,0 +1,104 @@
+"""
+ETags of tasks that embed their assignees: a change to an assignee's user
+details changes the ETag without touching the task's version.
+"""
+import asyncio
+
+import httpx
+from sqlalchemy import insert, select
+
+from db_utils.conn import async_session, engine
+from enums import TaskPriority, TaskStatus, UserRole
+from main import app
+from models import Base, Task, User, task_user_table
+from security import hash_password
+
+PASSWORD = "pw"
+
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    password_hash = hash_password(PASSWORD)
+    async with async_session() as db:
+        await db.execute(
+            insert(User),
+            [
+                {"id": 1, "username": "admin", "password": password_hash,
+                 "email": "admin@example.com", "role": UserRole.ADMIN},
+                {"id": 2, "username": "user", "password": password_hash,
+                 "email": "user@example.com", "role": UserRole.USER},
+            ],
+        )
+        await db.execute(
+            insert(Task),
+            [{"id": 1, "name": "Task 1", "description": None, "status": TaskStatus.TODO,
+              "priority": TaskPriority.MEDIUM, "creator_id": 1, "change_seq": 1}],
+        )
+        await db.execute(insert(task_user_table), [{"task_id": 1, "user_id": 2}])
+        await db.commit()
+
+
+async def task_version() -> int:
+    async with async_session() as db:
+        return await db.scalar(select(Task.version).where(Task.id == 1))
+
+
+async def run_assignee_rename():
+    await seed()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/token", data={"username": "admin", "password": PASSWORD})
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            etag = (await client.get("/tasks/1", headers=headers)).headers["etag"]
+            version = await task_version()
+
+            response = await client.put("/users/2", json={"username": "renamed"}, headers=headers)
+            assert response.status_code == 200, response.text
+
+            response = await client.get("/tasks/1", headers={**headers, "If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.json()["assignees"][0]["username"] == "renamed"
+            assert response.headers["etag"] != etag
+            assert await task_version() == version
+
+            # Перевірка для 304 рахує той самий стан виконавців, що й повна відповідь
+            response = await client.get(
+                "/tasks/1", headers={**headers, "If-None-Match": response.headers["etag"]}
+            )
+            assert response.status_code == 304
+    finally:
+        await engine.dispose()
+
+
+async def run_weak_if_match():
+    await seed()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/token", data={"username": "admin", "password": PASSWORD})
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            etag = (await client.get("/tasks/1", headers=headers)).headers["etag"]
+            assert not etag.startswith("W/")
+
+            response = await client.put(
+                "/tasks/1", json={"status": "done"}, headers={**headers, "If-Match": f"W/{etag}"}
+            )
+            assert response.status_code == 412
+
+            response = await client.put(
+                "/tasks/1", json={"status": "done"}, headers={**headers, "If-Match": etag}
+            )
+            assert response.status_code == 200, response.text
+    finally:
+        await engine.dispose()
+
+
+def test_assignee_rename_changes_etag_not_version():
+    asyncio.run(run_assignee_rename())
+
+
+def test_if_match_rejects_weak_etag():
+    asyncio.run(run_weak_if_match())
@@ -0,0 +1,112 @@
+"""
+SQL statements issued per request by the hot task routes. A failure here
+means a route started doing more round trips to the database; if that is
+intended, update the expected count together with the change.
+"""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import event, insert
+
+from db_utils.conn import async_session, engine
+from enums import TaskPriority, TaskStatus, UserRole
+from main import app
+from models import Base, Task, User, task_user_table
+from security import hash_password
+
+PASSWORD = "pw"
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    password_hash = hash_password(PASSWORD)
+    async with async_session() as db:
+        await db.execute(
+            insert(User),
+            [
+                {"id": 1, "username": "manager", "password": password_hash,
+                 "email": "manager@example.com", "role": UserRole.MANAGER},
+                {"id": 2, "username": "user", "password": password_hash,
+                 "email": "user@example.com", "role": UserRole.USER},
+            ],
+        )
+        await db.execute(
+            insert(Task),
+            [
+                {"id": task_id, "name": f"Task {task_id}", "description": None,
+                 "status": TaskStatus.TODO, "priority": TaskPriority.MEDIUM,
+                 "creator_id": 2, "change_seq": task_id}
+                for task_id in range(1, 11)
+            ],
+        )
+        await db.execute(
+            insert(task_user_table),
+            [{"task_id": task_id, "user_id": 2} for task_id in range(1, 11)],
+        )
+        await db.commit()
+
+
+async def count_statements(method: str, url: str, **kwargs) -> int:
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/token", data={"username": "manager", "password": PASSWORD}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            # Прогрів: версія токена потрапляє в кеш і не рахується
+            await client.get("/tasks?limit=1", headers=headers)
+
+            counter = StatementCounter()
+            event.listen(engine.sync_engine, "before_cursor_execute", counter)
+            try:
+                response = await client.request(method, url, headers=headers, **kwargs)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", counter)
+            assert response.status_code == 200, response.text
+            return counter.count
+    finally:
+        # Кожен тест має власний event loop, тож з'єднання пулу не переносяться між ними
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database():
+    asyncio.run(seed())
+
+
+def test_list_tasks():
+    # Сторінка задач + виконавці (selectinload)
+    assert asyncio.run(count_statements("GET", "/tasks")) == 2
+
+
+def test_get_task():
+    # Задача + виконавці (selectinload)
+    assert asyncio.run(count_statements("GET", "/tasks/1")) == 2
+
+
+def test_update_task_status():
+    # Задача з автором + виконавці, UPDATE ... RETURNING; перед COMMIT: upsert
+    # лічильників task_stats, номер зміни в sync_state і change_seq задачі
+    statements = asyncio.run(count_statements("PUT", "/tasks/2", json={"status": "done"}))
+    assert statements == 6
+
+
+def test_update_task_assignees():
+    # Як і вище, плюс пошук доданого виконавця і diff task_user: вставляється
+    # лише новий рядок, існуючий не чіпається
+    statements = asyncio.run(
+        count_statements("PUT", "/tasks/3", json={"assignees": [1, 2]})
+    )
+    assert statements == 8